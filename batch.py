@@ -0,0 +1,141 @@
+"""
+Batch and watch-folder job discovery for the CLI.
+
+One CLI process can style many decks so the OCR model, parsed template and
+title cache are loaded once. Jobs come from globs or directories of exports,
+from a job list file, or from a folder watched for new exports as Tableau
+Server drops them. A failing deck is reported and the batch carries on.
+
+Job list format: one deck per line, tab-separated `input [output [workbook]]`;
+blank lines and lines starting with # are ignored, relative paths are
+resolved against the job file's folder.
+
+Usage:
+  jobs = expand_inputs(["exports/*.pptx", "more_exports/"], output_dir="styled/")
+  results = run_batch(jobs, style_one)              # style_one(job) -> slide count
+  watch_folder("dropbox/", style_one, output_dir="styled/")
+"""
+
+import glob
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+STYLED_SUFFIX = "_styled"
+
+
+class BatchJob(NamedTuple):
+    input: Path
+    output: Path
+    workbook: Optional[Path] = None
+
+
+def default_output(input_path: Path, output_dir=None) -> Path:
+    """<output_dir or the input's folder>/<input stem>_styled.pptx"""
+    folder = Path(output_dir) if output_dir else input_path.parent
+    return folder / f"{input_path.stem}{STYLED_SUFFIX}.pptx"
+
+
+def _is_candidate(path: Path) -> bool:
+    """A .pptx export that is not an Office lock file or one of our own outputs."""
+    return (path.suffix.lower() == ".pptx" and not path.name.startswith("~$")
+            and not path.stem.endswith(STYLED_SUFFIX))
+
+
+def expand_inputs(patterns: Iterable[str], output_dir=None) -> List[BatchJob]:
+    """Jobs for input paths, directories (their .pptx files) and glob patterns, in order, without duplicates."""
+    paths = []
+    for pattern in patterns:
+        p = Path(pattern)
+        if p.is_dir():
+            paths.extend(sorted(x for x in p.iterdir() if x.is_file() and _is_candidate(x)))
+        elif glob.has_magic(pattern):
+            paths.extend(Path(x) for x in sorted(glob.glob(pattern)) if _is_candidate(Path(x)))
+        else:
+            paths.append(p)
+    seen = set()
+    jobs = []
+    for p in paths:
+        key = p.resolve()
+        if key not in seen:
+            seen.add(key)
+            jobs.append(BatchJob(p, default_output(p, output_dir)))
+    return jobs
+
+
+def read_job_list(path, output_dir=None) -> List[BatchJob]:
+    """Jobs from a tab-separated `input [output [workbook]]` list file."""
+    base = Path(path).resolve().parent
+    jobs = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = [f.strip() for f in line.split("\t")]
+            src = base / fields[0]
+            out = base / fields[1] if len(fields) > 1 and fields[1] else default_output(src, output_dir)
+            wb = base / fields[2] if len(fields) > 2 and fields[2] else None
+            jobs.append(BatchJob(src, out, wb))
+    return jobs
+
+
+def run_job(job: BatchJob, handle: Callable) -> dict:
+    """Run handle(job), returning a result record instead of raising."""
+    t0 = time.perf_counter()
+    try:
+        slides = handle(job)
+        result = {"input": str(job.input), "output": str(job.output), "ok": True, "slides": slides}
+        print(f"[ok] {job.input} -> {job.output} ({slides} slides, {time.perf_counter() - t0:.1f}s)")
+    except Exception as e:
+        traceback.print_exc()
+        result = {"input": str(job.input), "output": str(job.output), "ok": False, "error": str(e) or e.__class__.__name__}
+        print(f"[failed] {job.input}: {result['error']}")
+    result["seconds"] = round(time.perf_counter() - t0, 3)
+    return result
+
+
+def run_batch(jobs: Iterable[BatchJob], handle: Callable) -> List[dict]:
+    """Run every job, reporting each outcome and a summary; failures do not stop the batch."""
+    results = [run_job(job, handle) for job in jobs]
+    failed = sum(1 for r in results if not r["ok"])
+    print(f"Batch: {len(results) - failed} succeeded, {failed} failed")
+    return results
+
+
+def watch_folder(folder, handle: Callable, output_dir=None, interval: float = 5.0, settle_seconds: float = 2.0,
+                 should_stop: Optional[Callable[[], bool]] = None):
+    """
+    Poll folder for new or changed .pptx exports and run handle on each one
+    once its size and mtime have stayed the same for settle_seconds (so
+    half-copied files are not picked up). Exports whose output is already
+    newer than the export are skipped, so a restarted watcher does not redo
+    them. Runs until should_stop() returns True (or forever).
+    """
+    folder = Path(folder)
+    print(f"Watching {folder} for new exports every {interval:g}s (Ctrl+C to stop)...")
+    observed = {}  # path -> (size, mtime) at the last poll
+    handled = {}   # path -> (size, mtime) when it was styled
+    while not (should_stop and should_stop()):
+        now = time.time()
+        for path in sorted(folder.iterdir()):
+            if not path.is_file() or not _is_candidate(path):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            signature = (st.st_size, st.st_mtime)
+            if handled.get(path) == signature:
+                continue
+            output = default_output(path, output_dir)
+            if path not in handled and output.exists() and output.stat().st_mtime >= st.st_mtime:
+                handled[path] = signature
+                continue
+            if observed.get(path) != signature or now - st.st_mtime < settle_seconds:
+                observed[path] = signature
+                continue
+            run_job(BatchJob(path, output), handle)
+            handled[path] = signature
+        time.sleep(interval)
@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+"""
+Benchmark every stage of the styling pipeline on synthetic Tableau-style decks.
+
+Decks are generated from the example files: `Super Store.pptx` provides the
+slide size and the one-full-slide-picture-per-slide shape Tableau exports use,
+`Theme Powerpoint.pptx` is the brand template. Each stage is timed separately
+and the results (plus peak RSS) are written as JSON so runs can be diffed
+between versions.
+
+Usage:
+  python benchmarks/bench_pipeline.py --slides 80 --width 2400 --height 1350 --format png \
+      --title "Sales by Region" --output bench.json
+  python benchmarks/bench_pipeline.py --no-ocr            # skip the easyocr stage
+  python benchmarks/bench_pipeline.py --deck "example_files/Super Store.pptx" \
+      --truth-workbook "example_files/Super Store.twb"     # OCR accuracy against the workbook's titles
+
+OCR stages need easyocr; they are reported as skipped when it is not installed.
+The "ocr_modes" section compares full OCR (detection + recognition) with the
+recognition-only fast path: latency per mode, and accuracy against the titles
+drawn on synthetic dashboards or, for --deck, a --truth-workbook.
+The "image_encodings" section encodes the first --encode-sample pictures with
+each image_encoding strategy: rounded-corner RGBA (raster corners) and, for
+"vector_*", the untouched source picture. It reports time and bytes per slide
+and the bytes saved per slide against truecolor.
+The "save_modes" section saves the source deck (its pictures as exported,
+e.g. JPEG with --format jpeg) and the assembled output (rounded-corner PNGs)
+with python-pptx's own writer and with pptx_writer's zip levels and stored
+media, reporting the median save time and the file size of each.
+The "startup" section times `style_tableau_pptx.py --help` in fresh interpreters
+against --startup-target and checks that importing the module leaves easyocr
+unloaded; the script exits non-zero when the target is missed.
+The "web_workers" section (Linux, needs gunicorn) starts the web app under
+gunicorn.conf.py with --web-workers processes, once with the pre-fork preload
+and once with every worker loading its own models, styles the example deck a
+few times, and reports each process's RSS, PSS and private memory from
+/proc/<pid>/smaps_rollup. PSS splits shared pages between the processes
+sharing them, so the PSS total is the deployment's real footprint.
+"""
+
+import argparse
+import difflib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+from pptx import Presentation  # noqa: E402
+from pptx.util import Emu  # noqa: E402
+
+import style_tableau_pptx as stp  # noqa: E402
+from style_profile import StyleProfile  # noqa: E402
+from pptx_writer import save_pptx  # noqa: E402
+from image_encoding import encode_picture  # noqa: E402
+from source_reader import iter_source_slides  # noqa: E402
+from workbook_titles import WorkbookTitles  # noqa: E402
+
+EXAMPLES = ROOT / "example_files"
+SEED_DECK = EXAMPLES / "Super Store.pptx"
+TEMPLATE = EXAMPLES / "Theme Powerpoint.pptx"
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _font(size):
+    for name in ("DejaVuSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def make_dashboard_image(width, height, title, seed, fmt="png") -> bytes:
+    """A flat-colour dashboard: title top-left (where Tableau puts it, unless title is None) and a few bar charts."""
+    rnd = random.Random(seed)
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    if title:
+        draw.text((int(width * 0.01), int(height * 0.008)), title, fill=(40, 40, 40), font=_font(max(10, int(height * 0.03))))
+    palette = [(78, 121, 167), (242, 142, 43), (225, 87, 89), (118, 183, 178), (89, 161, 79)]
+    panels = 4
+    top = int(height * 0.12)
+    for p in range(panels):
+        x0 = int(width * (0.03 + p * 0.24))
+        x1 = x0 + int(width * 0.21)
+        draw.rectangle([x0, top, x1, height - int(height * 0.05)], outline=(220, 220, 220))
+        bars = 8
+        bw = (x1 - x0) // (bars * 2)
+        for b in range(bars):
+            bh = int((height - top) * rnd.uniform(0.1, 0.8))
+            bx = x0 + bw // 2 + b * 2 * bw
+            draw.rectangle([bx, height - int(height * 0.06) - bh, bx + bw, height - int(height * 0.06)],
+                           fill=palette[(p + b) % len(palette)])
+    buf = io.BytesIO()
+    if fmt == "jpeg":
+        img.save(buf, "JPEG", quality=90)
+    else:
+        img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _clear_slides(prs):
+    sldIdLst = prs.slides._sldIdLst
+    for sldId in list(sldIdLst):
+        prs.part.drop_rel(sldId.rId)
+        sldIdLst.remove(sldId)
+
+
+def make_synthetic_deck(path, slides, width, height, fmt, title, untitled_ratio=0.0):
+    """
+    Write a Tableau-style export: one full-width dashboard picture per slide, seeded from SEED_DECK.
+    About untitled_ratio of the dashboards get no title (like full-bleed maps and KPI tiles).
+    Returns {slide idx: title drawn on it, or None}.
+    """
+    prs = Presentation(str(SEED_DECK))
+    _clear_slides(prs)
+    blank = prs.slide_layouts[len(prs.slide_layouts) - 1]
+    titles = {}
+    for i in range(slides):
+        slide = prs.slides.add_slide(blank)
+        for ph in list(slide.placeholders):
+            ph._element.getparent().remove(ph._element)
+        untitled = int((i + 1) * untitled_ratio) > int(i * untitled_ratio)
+        titles[i + 1] = None if untitled else f"{title} {i + 1}"
+        blob = make_dashboard_image(width, height, titles[i + 1], seed=i, fmt=fmt)
+        pic = slide.shapes.add_picture(io.BytesIO(blob), 0, 0)
+        pic.width = prs.slide_width
+        pic.height = Emu(int(prs.slide_width * height / width))
+    prs.save(str(path))
+    return titles
+
+
+class StageTimer:
+    """Accumulates wall time and call counts per named stage."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def time(self, name, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - t0
+        st = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+        st["seconds"] += elapsed
+        st["calls"] += 1
+        return result
+
+    def skip(self, name, reason):
+        self.stages[name] = {"skipped": reason}
+
+    def report(self):
+        out = {}
+        for name, st in self.stages.items():
+            if "skipped" in st:
+                out[name] = st
+                continue
+            out[name] = {
+                "seconds": round(st["seconds"], 6),
+                "calls": st["calls"],
+                "ms_per_call": round(1000 * st["seconds"] / max(1, st["calls"]), 3),
+            }
+        return out
+
+
+def _load_reader(langs=("en",)):
+    try:
+        import easyocr
+    except ImportError:
+        return None
+    return easyocr.Reader(list(langs), gpu=False)
+
+
+def measure_startup(runs=5, target_seconds=1.0):
+    """Median wall time of `style_tableau_pptx.py --help` in a fresh interpreter, and whether import pulls in easyocr."""
+    cli = [sys.executable, str(ROOT / "style_tableau_pptx.py"), "--help"]
+    samples = []
+    for _ in range(max(1, runs)):
+        t0 = time.perf_counter()
+        subprocess.run(cli, cwd=str(ROOT), stdout=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - t0)
+    probe = "import json, sys, style_tableau_pptx; print(json.dumps([m for m in ('easyocr', 'torch') if m in sys.modules]))"
+    loaded = subprocess.run([sys.executable, "-c", probe], cwd=str(ROOT), capture_output=True, text=True, check=True)
+    median = statistics.median(samples)
+    return {
+        "cli_help_seconds": round(median, 4),
+        "cli_help_samples": [round(x, 4) for x in samples],
+        "heavy_modules_on_import": json.loads(loaded.stdout),
+        "target_seconds": target_seconds,
+        "met": median <= target_seconds,
+    }
+
+
+def title_accuracy(titles, truths):
+    """Exact (case/space-insensitive) matches and mean similarity of OCR'd titles against expected ones."""
+    norm = lambda t: " ".join((t or "").lower().split())
+    pairs = [(norm(t), norm(e)) for t, e in zip(titles, truths)]
+    if not pairs:
+        return None
+    return {
+        "exact": round(sum(1 for t, e in pairs if t == e) / len(pairs), 3),
+        "similarity": round(statistics.mean(difflib.SequenceMatcher(None, t, e).ratio() for t, e in pairs), 3),
+    }
+
+
+def compare_ocr_modes(decoded, truths, reader, args, timer):
+    """Titles from every OCR mode (uncached), timed as extract_titles_<mode>, with accuracy when truths are known."""
+    report = {}
+    for mode in stp.OCR_MODES:
+        # Counters tell how often the fast path fell back to full OCR
+        stp.METRICS.reset()
+        stp.METRICS.enabled = True
+        try:
+            titles = timer.time(f"extract_titles_{mode}", stp.extract_titles_batched, decoded, reader,
+                                args.ocr_batch_size, stp.INK_SCREEN, mode)
+        finally:
+            stp.METRICS.enabled = False
+        counters = stp.METRICS.report()["counters"]
+        report[mode] = {
+            "seconds": round(timer.stages[f"extract_titles_{mode}"]["seconds"], 4),
+            "fast_path": counters.get("ocr_fast_path", 0),
+            "fallbacks": counters.get("ocr_fast_fallback", 0),
+            "accuracy": title_accuracy(titles, truths) if truths is not None else None,
+        }
+    return report
+
+
+ENCODINGS = {
+    "truecolor": dict(encoding="truecolor"),
+    "truecolor_level9": dict(encoding="truecolor", compress_level=9),
+    "truecolor_optimize": dict(encoding="truecolor", optimize=True),
+    "palette": dict(encoding="palette"),
+    "palette_optimize": dict(encoding="palette", optimize=True),
+    "smallest": dict(encoding="smallest"),
+}
+
+
+def compare_image_encodings(blobs, radius_px, sample=20):
+    """Per-slide encode time and size of each ENCODINGS entry (and vector mode's smallest) on blobs[:sample]."""
+    totals = {name: [0.0, 0] for name in [*ENCODINGS, "vector_source", "vector_smallest"]}
+    count = 0
+    for blob in blobs[:max(0, sample)]:
+        with Image.open(io.BytesIO(blob)) as img:
+            img.load()
+            rounded = stp.round_image_corners(img, radius_px)
+            runs = [(name, rounded, options) for name, options in ENCODINGS.items()]
+            runs.append(("vector_smallest", img, dict(encoding="smallest", original=blob)))
+            for name, im, options in runs:
+                t0 = time.perf_counter()
+                data = encode_picture(im, **options)
+                totals[name][0] += time.perf_counter() - t0
+                totals[name][1] += len(data)
+        totals["vector_source"][1] += len(blob)
+        count += 1
+    if not count:
+        return {}
+    report = {}
+    for name, (seconds, size) in totals.items():
+        baseline = totals["vector_source" if name.startswith("vector_") else "truecolor"][1]
+        report[name] = {"ms_per_slide": round(seconds * 1000 / count, 2), "bytes_per_slide": size // count,
+                        "saved_per_slide": (baseline - size) // count}
+    report["slides"] = count
+    return report
+
+
+SAVE_MODES = {
+    "python_pptx": None,
+    "level6": dict(zip_level=6, store_media=False),
+    "level6_store_media": dict(zip_level=6, store_media=True),
+    "level1_store_media": dict(zip_level=1, store_media=True),
+    "level9_store_media": dict(zip_level=9, store_media=True),
+}
+
+
+def compare_save_modes(prs, runs=3):
+    """Median save time and output size of prs for each SAVE_MODES entry."""
+    report = {}
+    for name, options in SAVE_MODES.items():
+        samples = []
+        for _ in range(max(1, runs)):
+            buf = io.BytesIO()
+            t0 = time.perf_counter()
+            stored = prs.save(buf) if options is None else save_pptx(prs, buf, **options)
+            samples.append(time.perf_counter() - t0)
+        report[name] = {"seconds": round(statistics.median(samples), 4), "bytes": buf.tell(),
+                        "stored_parts": stored or 0}
+    return report
+
+
+def bench_pipeline(deck, args, timer, truths=None):
+    """
+    Time each stage of style_tableau_pptx on `deck` in isolation.
+    truths ({slide idx: expected title or None}) enables the OCR accuracy comparison.
+    """
+    # Source parse + blob extraction (python-pptx object model, as before the lazy reader)
+    src = timer.time("source_parse", Presentation, str(deck))
+    timer.time("blob_extraction", stp.collect_source_slides, src)
+    del src
+    # Lazy zip reader used by the CLI/web app
+    items = timer.time("lazy_source_read", lambda: list(iter_source_slides(deck)))
+    blobs = [blob for _, blob, _ in items if blob is not None]
+    expected = [truths.get(idx) for idx, blob, _ in items if blob is not None] if truths is not None else None
+
+    decoded = [timer.time("decode", lambda b: Image.open(io.BytesIO(b)).convert("RGB"), b) for b in blobs]
+
+    # Blank-strip pre-screen on the title crops
+    blank = 0
+    for img in decoded:
+        crop = stp._title_crop(img)
+        if timer.time("title_ink_box", stp.title_ink_box, crop, **stp.INK_SCREEN) is None:
+            blank += 1
+
+    # OCR
+    reader = None if args.no_ocr else timer.time("ocr_model_load", _load_reader)
+    if reader is None:
+        reason = "--no-ocr" if args.no_ocr else "easyocr not installed"
+        timer.skip("extract_title_from_image", reason)
+        timer.skip("extract_titles_batched", reason)
+        ocr_modes = {"skipped": reason}
+    else:
+        for img in decoded:
+            timer.time("extract_title_from_image", stp.extract_title_from_image, img, reader)
+        timer.time("extract_titles_batched", stp.extract_titles_batched, decoded, reader, args.ocr_batch_size)
+        ocr_modes = compare_ocr_modes(decoded, expected, reader, args, timer)
+
+    image_encodings = compare_image_encodings(blobs, args.border_radius, args.encode_sample)
+
+    # Raster corner rounding + PNG encode (the in-memory add_rounded_corners)
+    rounded = []
+    for img in decoded:
+        def round_and_encode(im=img):
+            buf = io.BytesIO()
+            stp.round_image_corners(im, args.border_radius).save(buf, "PNG")
+            return buf.getvalue()
+        rounded.append(timer.time("add_rounded_corners", round_and_encode))
+    del decoded
+
+    # Output assembly on the brand template
+    out = Presentation(str(TEMPLATE))
+    layout = stp.find_layout(out)
+    shadow = dict(transparency=0.8, blur_pt=15, angle_deg=34, distance_pt=3, color=(0, 0, 0))
+    profile = StyleProfile(border_radius=args.border_radius)
+    for n, data in enumerate(rounded, start=1):
+        slide = out.slides.add_slide(layout)
+        if slide.shapes.title:
+            slide.shapes.title.text = f"{args.title} {n}"
+        pic = timer.time("add_picture", slide.shapes.add_picture, io.BytesIO(data), 0, 0)
+        timer.time("fit_image_on_blank", stp.fit_image_on_blank, slide, out, pic)
+        timer.time("apply_rounded_corners_xml", stp.apply_rounded_corners_xml, pic, args.border_radius)
+        timer.time("apply_box_shadow", stp.apply_box_shadow, pic, **shadow)
+        # The same corners + shadow as the two stages above, cloned from precompiled fragments
+        timer.time("style_profile_picture", profile.style_picture, pic, *pic.image.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "out.pptx"
+        timer.time("save", out.save, str(target))
+        output_bytes = target.stat().st_size
+    save_modes = {"source": compare_save_modes(Presentation(str(deck)), args.save_runs),
+                  "output": compare_save_modes(out, args.save_runs)}
+
+    # Whole deck through the bulk writer, for comparison with the per-slide API stages above
+    out = Presentation(str(TEMPLATE))
+    layout = stp.find_layout(out)
+    writer = stp.BulkSlideWriter(out, layout, profile)
+    for n, data in enumerate(rounded, start=1):
+        timer.time("bulk_assembly", writer.add, f"{args.title} {n}", data)
+    return {"source_slides": len(items), "pictures": len(blobs), "blank_title_strips": blank, "ocr_modes": ocr_modes,
+            "output_bytes": output_bytes, "save_modes": save_modes, "image_encodings": image_encodings}
+
+
+def _memory_mb(pid) -> dict:
+    """RSS, PSS, private and shared memory of a process from /proc/<pid>/smaps_rollup."""
+    kb = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        key, _, value = line.partition(":")
+        parts = value.split()
+        if len(parts) == 2 and parts[1] == "kB":
+            kb[key] = int(parts[0])
+    mb = lambda *keys: round(sum(kb.get(k, 0) for k in keys) / 1024, 1)  # noqa: E731
+    return {
+        "rss_mb": mb("Rss"),
+        "pss_mb": mb("Pss"),
+        "private_mb": mb("Private_Clean", "Private_Dirty"),
+        "shared_mb": mb("Shared_Clean", "Shared_Dirty"),
+    }
+
+
+def _child_pids(pid) -> list:
+    children = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # Fields after the parenthesised command name: state, ppid, ...
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(stat.parent.name))
+    return sorted(children)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _post_deck(url, template, deck):
+    """POST / with one template and one input deck (multipart/form-data); returns the response size."""
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for field, path in (("template", template), ("inputs", deck)):
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{path.name}"\r\n'
+                   f"Content-Type: application/octet-stream\r\n\r\n".encode())
+        body.write(path.read_bytes())
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode())
+    req = urllib.request.Request(url, data=body.getvalue(),
+                                 headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    with urllib.request.urlopen(req, timeout=600) as resp:
+        return len(resp.read())
+
+
+def measure_web_workers(workers=2, preload=True, requests=4, boot_timeout=600.0):
+    """Per-process memory of the web app under gunicorn after `requests` styling requests."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/"
+    env = dict(os.environ, PPTX_WEB_WORKERS=str(workers), PPTX_BIND=f"127.0.0.1:{port}",
+               PPTX_PRELOAD_APP="1" if preload else "0", PPTX_PRELOAD_TEMPLATES=str(TEMPLATE),
+               PPTX_STYLIZER_CACHE="0")
+    env.pop("PPTX_JOB_ROOT", None)
+    t0 = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", str(ROOT / "gunicorn.conf.py")],
+                              cwd=str(ROOT), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # Ready once every worker is forked and one answers; without preload each
+        # worker loads its models after forking, so also wait for RSS to settle
+        last, steady = None, 0
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+            if time.perf_counter() - t0 > boot_timeout:
+                raise RuntimeError(f"web workers not ready within {boot_timeout:.0f}s")
+            pids = _child_pids(server.pid)
+            if len(pids) == workers:
+                try:
+                    urllib.request.urlopen(url, timeout=5).read()
+                    rss = sum(_memory_mb(p)["rss_mb"] for p in pids)
+                    steady = steady + 1 if last is not None and abs(rss - last) <= 0.01 * last else 0
+                    if steady >= 3:
+                        break
+                    last = rss
+                except (urllib.error.URLError, OSError):
+                    pass
+            time.sleep(0.5)
+        boot = time.perf_counter() - t0
+        for _ in range(requests):
+            _post_deck(url, TEMPLATE, SEED_DECK)
+        master = _memory_mb(server.pid)
+        per_worker = [dict(pid=p, **_memory_mb(p)) for p in _child_pids(server.pid)]
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    return {
+        "preload": preload,
+        "workers": workers,
+        "requests": requests,
+        "boot_seconds": round(boot, 2),
+        "master": master,
+        "per_worker": per_worker,
+        "mean_worker_pss_mb": round(statistics.mean(w["pss_mb"] for w in per_worker), 1),
+        "mean_worker_private_mb": round(statistics.mean(w["private_mb"] for w in per_worker), 1),
+        "total_pss_mb": round(master["pss_mb"] + sum(w["pss_mb"] for w in per_worker), 1),
+    }
+
+
+def compare_web_workers(workers, requests):
+    """measure_web_workers with and without preload, or why it was skipped."""
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return {"skipped": "gunicorn is not installed"}
+    if not Path("/proc/self/smaps_rollup").exists():
+        return {"skipped": "needs Linux /proc/<pid>/smaps_rollup"}
+    try:
+        import easyocr  # noqa: F401
+        ocr = True
+    except ImportError:
+        ocr = False
+    runs = {"preload": measure_web_workers(workers, True, requests),
+            "no_preload": measure_web_workers(workers, False, requests)}
+    runs["easyocr"] = ocr
+    runs["total_pss_saved_mb"] = round(runs["no_preload"]["total_pss_mb"] - runs["preload"]["total_pss_mb"], 1)
+    return runs
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--slides", type=int, default=40, help="Slides in the synthetic deck (default 40)")
+    ap.add_argument("--width", type=int, default=1684, help="Dashboard image width in px (default 1684, as in the example export)")
+    ap.add_argument("--height", type=int, default=874, help="Dashboard image height in px (default 874)")
+    ap.add_argument("--format", choices=["png", "jpeg"], default="png", help="Dashboard image format (default png)")
+    ap.add_argument("--title", default="Sales by Region", help="Title text drawn on each dashboard (slide number appended)")
+    ap.add_argument("--untitled-ratio", type=float, default=0.0,
+                    help="Fraction of dashboards generated without a title, e.g. maps and KPI tiles (default 0)")
+    ap.add_argument("--border-radius", type=int, default=10)
+    ap.add_argument("--ocr-batch-size", type=int, default=8)
+    ap.add_argument("--no-ocr", action="store_true", help="Skip OCR stages")
+    ap.add_argument("--deck", default=None, help="Benchmark an existing deck instead of generating one")
+    ap.add_argument("--truth-workbook", default=None,
+                    help="Tableau workbook the --deck was exported from; its titles (matched by position) score OCR accuracy")
+    ap.add_argument("--startup-runs", type=int, default=5, help="Fresh-interpreter CLI starts to time (0 skips; default 5)")
+    ap.add_argument("--startup-target", type=float, default=1.0,
+                    help="Maximum median seconds for `style_tableau_pptx.py --help` (default 1.0)")
+    ap.add_argument("--encode-sample", type=int, default=20,
+                    help="Pictures encoded with every strategy for image_encodings (0 skips; default 20)")
+    ap.add_argument("--save-runs", type=int, default=3, help="Saves per mode in the save_modes comparison (default 3)")
+    ap.add_argument("--web-workers", type=int, default=2,
+                    help="gunicorn workers for the web memory comparison (0 skips; default 2)")
+    ap.add_argument("--web-requests", type=int, default=4,
+                    help="Styling requests sent to the web workers before measuring (default 4)")
+    ap.add_argument("--output", "-o", default=None, help="Write JSON results here (default: stdout)")
+    args = ap.parse_args()
+
+    timer = StageTimer()
+    startup = measure_startup(args.startup_runs, args.startup_target) if args.startup_runs > 0 else None
+    web_workers = compare_web_workers(args.web_workers, args.web_requests) if args.web_workers > 0 else None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.deck:
+            deck = Path(args.deck)
+            generation = None
+            truths = None
+            if args.truth_workbook:
+                pictures = [idx for idx, blob, _ in iter_source_slides(deck) if blob is not None]
+                truths = WorkbookTitles.load(args.truth_workbook).match_order(pictures) or None
+                if truths is None:
+                    print("Warning: --truth-workbook sheets do not line up with the deck's pictures; accuracy skipped",
+                          file=sys.stderr)
+        else:
+            deck = Path(tmp) / "synthetic.pptx"
+            t0 = time.perf_counter()
+            truths = make_synthetic_deck(deck, args.slides, args.width, args.height, args.format, args.title,
+                                         args.untitled_ratio)
+            generation = round(time.perf_counter() - t0, 3)
+        summary = bench_pipeline(deck, args, timer, truths)
+        summary["input_bytes"] = deck.stat().st_size
+
+    result = {
+        "config": {
+            "slides": args.slides if not args.deck else None,
+            "width": args.width,
+            "height": args.height,
+            "format": args.format,
+            "title": args.title,
+            "untitled_ratio": args.untitled_ratio,
+            "deck": args.deck,
+            "ocr": not args.no_ocr,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "generation_seconds": generation,
+        "summary": summary,
+        "startup": startup,
+        "web_workers": web_workers,
+        "stages": timer.report(),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"Wrote {args.output}")
+    else:
+        print(text)
+    if startup and not startup["met"]:
+        print(f"Startup target missed: {startup['cli_help_seconds']}s > {args.startup_target}s", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for serving the web app from several worker processes.
+
+The master imports the app and runs its preload (OCR weights for
+PPTX_OCR_LANGS, templates from PPTX_PRELOAD_TEMPLATES) once, then forks the
+workers, which share those pages copy-on-write instead of each loading torch
+and the model. With PPTX_PRELOAD_APP=0 every worker imports the app and loads
+its own copy after forking (PPTX_PRELOAD=0 defers loading to the first request).
+
+Usage:
+  pip install gunicorn
+  gunicorn -c gunicorn.conf.py
+  PPTX_WEB_WORKERS=4 PPTX_BIND=0.0.0.0:8000 PPTX_PRELOAD_TEMPLATES=brand.pptx gunicorn -c gunicorn.conf.py
+"""
+
+import os
+import tempfile
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = "style_pptx_web:create_app()"
+bind = os.environ.get("PPTX_BIND", "127.0.0.1:5001")
+workers = int(os.environ.get("PPTX_WEB_WORKERS", "2"))
+# Threads per worker: job progress streams (SSE) hold a thread each
+worker_class = "gthread"
+threads = int(os.environ.get("PPTX_WEB_THREADS", "4"))
+# POST / styles synchronously; large merges take minutes
+timeout = int(os.environ.get("PPTX_WEB_TIMEOUT", "600"))
+preload_app = os.environ.get("PPTX_PRELOAD_APP", "1") != "0"
+
+# One job root for all workers, so any of them can report on or serve any job
+os.environ.setdefault("PPTX_JOB_ROOT", tempfile.mkdtemp(prefix="pptx-jobs-"))
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        import style_pptx_web
+        style_pptx_web.after_fork()
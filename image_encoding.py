@@ -0,0 +1,96 @@
+"""
+Encoding strategies for the dashboard pictures placed on slides.
+
+Tableau dashboards are mostly flat colours, so a 256-colour adaptive palette
+holds them almost exactly at a fraction of the size of a 24/32-bit PNG (and
+quantizing plus encoding is faster than encoding the truecolour image).
+Strategies:
+
+  truecolor  RGB/RGBA PNG, as before (JPEG sources that are only resampled stay JPEG)
+  palette    adaptive palette PNG; rounded corners get one reserved fully
+             transparent entry and the rest stays opaque. PNG sources kept
+             as-is in vector corner mode are re-encoded
+             too; JPEG sources are left alone
+  smallest   the smallest of the truecolour result (or the untouched source
+             picture) and the palette PNG. The palette candidate only counts
+             when its mean per-channel error stays within PALETTE_MAX_ERROR, so
+             photo-like pictures keep full colour
+
+compress_level (0-9) and optimize are passed to every PNG encode; optimize
+shaves a little more off at several times the encode time.
+
+Usage:
+  data = encode_picture(img, "smallest", compress_level=6)
+  data = encode_picture(img, "smallest", original=source_bytes)   # source kept unless beaten
+"""
+
+import io
+
+from PIL import Image, ImageChops, ImageStat
+
+IMAGE_ENCODINGS = ("truecolor", "palette", "smallest")
+DEFAULT_PNG_LEVEL = 6
+PALETTE_COLORS = 256
+# Mean absolute error per channel (0-255) above which "smallest" ignores the palette candidate
+PALETTE_MAX_ERROR = 3.0
+
+
+def palette_image(img, colors: int = PALETTE_COLORS):
+    """
+    img reduced to an adaptive palette of at most colors entries. With an alpha
+    channel the colours get colors - 1 entries and the last one is reserved as
+    fully transparent for pixels under half opacity; everything else stays opaque.
+    """
+    if not (img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info):
+        return img.convert("RGB").quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    # Quantizing RGBA directly also quantizes alpha, leaving opaque pixels at 254
+    rgba = img.convert("RGBA")
+    paletted = rgba.convert("RGB").quantize(colors - 1, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    clear = colors - 1
+    palette = paletted.getpalette()[:3 * clear]
+    paletted.putpalette(palette + [0] * (3 * colors - len(palette)))
+    paletted.paste(clear, mask=rgba.getchannel("A").point(lambda a: 255 if a < 128 else 0))
+    paletted.info["transparency"] = clear
+    return paletted
+
+
+def palette_error(img, paletted) -> float:
+    """Mean absolute per-channel difference between img and its paletted version."""
+    mode = "RGBA" if "transparency" in paletted.info else "RGB"
+    diff = ImageChops.difference(paletted.convert(mode), img.convert(mode))
+    means = ImageStat.Stat(diff).mean
+    return sum(means) / len(means)
+
+
+def png_bytes(img, compress_level: int = DEFAULT_PNG_LEVEL, optimize: bool = False) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=compress_level, optimize=optimize)
+    return buf.getvalue()
+
+
+def encode_picture(img, encoding: str = "truecolor", compress_level: int = DEFAULT_PNG_LEVEL,
+                   optimize: bool = False, original: bytes = None, jpeg: bool = False) -> bytes:
+    """
+    Encoded bytes of img for a slide. original is the source picture's bytes
+    when img is that picture unchanged (its truecolour candidate, never
+    re-encoded); jpeg keeps a resampled JPEG source as JPEG in that candidate.
+    """
+    if original is not None:
+        base = original
+    elif jpeg:
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=90)
+        base = buf.getvalue()
+    else:
+        base = None
+    if encoding == "truecolor" or (encoding == "palette" and jpeg):
+        return base if base is not None else png_bytes(img, compress_level, optimize)
+    paletted = palette_image(img)
+    if encoding == "palette":
+        return png_bytes(paletted, compress_level, optimize)
+    if base is None:
+        base = png_bytes(img, compress_level, optimize)
+    if palette_error(img, paletted) > PALETTE_MAX_ERROR:
+        return base
+    candidate = png_bytes(paletted, compress_level, optimize)
+    return candidate if len(candidate) < len(base) else base
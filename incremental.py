@@ -0,0 +1,151 @@
+"""
+Sidecar manifest that lets the CLI restyle only the slides that changed.
+
+Every run writes `<output>.manifest.json` next to the deck, recording for each
+output slide the SHA1 of its source image, the resolved title, and the media
+part its styled image was stored under, together with a hash of the options
+that shaped titles and images. With `--incremental`, a source slide whose image
+hash is listed under the same options hash reuses that title and styled image
+from the previous output instead of being decoded, OCR'd, and rounded again.
+Slide order always follows the new source.
+
+Usage:
+  run = IncrementalRun(output, title_image_options, enabled=args.incremental)
+  for idx, blob, fallback in run.items(iter_source_slides(src)):
+      ...                                   # reused slides come through with blob=None
+  hit = run.reused(idx)                     # (title, image_bytes) or None
+  run.record(idx, title, image_bytes)
+  run.close_previous(); out.save(output); run.write(out)
+"""
+
+import hashlib
+import json
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from pptx.parts.image import ImagePart
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(output) -> Path:
+    return Path(str(output) + ".manifest.json")
+
+
+def blob_digest(blob: bytes) -> str:
+    return hashlib.sha1(blob).hexdigest()
+
+
+def file_digest(path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def options_digest(options: dict) -> str:
+    """Stable hash of the options that determine titles and styled images."""
+    return hashlib.sha1(json.dumps(options, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class IncrementalRun:
+    """
+    Tracks one run's manifest and, when enabled, what it can reuse from the
+    previous output at the same path. The previous output is ignored when its
+    manifest is missing, unreadable, from another version, or was written
+    with different options.
+    """
+
+    def __init__(self, output, options: dict, enabled: bool = False):
+        self.output = Path(output)
+        self.options_hash = options_digest(options)
+        self.options = options
+        self._hashes: Dict[int, str] = {}
+        self._records: Dict[int, Tuple[str, str, Optional[str]]] = {}
+        self._previous: Dict[str, dict] = {}
+        self._pending: Dict[int, dict] = {}
+        self._zip: Optional[zipfile.ZipFile] = None
+        self.reused_count = 0
+        if enabled:
+            self._load_previous()
+
+    def _load_previous(self):
+        path = manifest_path(self.output)
+        if not (path.exists() and self.output.exists()):
+            print("Incremental: no previous output/manifest, styling every slide")
+            return
+        try:
+            manifest = json.loads(path.read_text())
+        except Exception as e:
+            print(f"Warning: could not read {path.name}, styling every slide: {e}")
+            return
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("options_hash") != self.options_hash:
+            print("Incremental: styling options changed since the last run, styling every slide")
+            return
+        try:
+            self._zip = zipfile.ZipFile(str(self.output))
+        except zipfile.BadZipFile as e:
+            print(f"Warning: previous output unreadable, styling every slide: {e}")
+            return
+        stored = set(self._zip.namelist())
+        for entry in manifest.get("slides", []):
+            part = entry.get("image_part")
+            if entry.get("source_sha1") and part and part.lstrip("/") in stored:
+                self._previous[entry["source_sha1"]] = entry
+
+    def items(self, items: Iterable) -> Iterable:
+        """Pass (idx, blob, fallback_title) items through, hashing blobs; reusable slides get blob=None."""
+        for idx, blob, fallback in items:
+            if blob is not None:
+                digest = blob_digest(blob)
+                self._hashes[idx] = digest
+                entry = self._previous.get(digest)
+                if entry is not None:
+                    self._pending[idx] = entry
+                    yield idx, None, fallback
+                    continue
+            yield idx, blob, fallback
+
+    def reused(self, idx: int) -> Optional[Tuple[str, bytes]]:
+        """(title, styled image bytes) from the previous output for slide idx, or None."""
+        entry = self._pending.pop(idx, None)
+        if entry is None:
+            return None
+        self.reused_count += 1
+        return entry["title"], self._zip.read(entry["image_part"].lstrip("/"))
+
+    def record(self, idx: int, title: str, image_bytes: Optional[bytes]):
+        """Remember what output slide idx was built from, for the next manifest."""
+        self._records[idx] = (self._hashes.get(idx), title, blob_digest(image_bytes) if image_bytes else None)
+
+    def close_previous(self):
+        """Release the previous output before it is overwritten."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def write(self, prs):
+        """Write the manifest for the just-saved presentation prs."""
+        parts = {}
+        for part in prs.part.package.iter_parts():
+            if isinstance(part, ImagePart):
+                parts.setdefault(part.sha1, str(part.partname))
+        slides = []
+        for idx in sorted(self._records):
+            source_sha1, title, image_sha1 = self._records[idx]
+            slides.append({
+                "index": idx,
+                "source_sha1": source_sha1,
+                "title": title,
+                "image_sha1": image_sha1,
+                "image_part": parts.get(image_sha1) if image_sha1 else None,
+            })
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "options_hash": self.options_hash,
+            "options": self.options,
+            "slides": slides,
+        }
+        manifest_path(self.output).write_text(json.dumps(manifest, indent=2, default=str) + "\n")
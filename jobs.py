@@ -0,0 +1,313 @@
+"""
+Background job runner for the web app.
+
+Styling a large merge can take minutes, longer than most proxies allow an HTTP
+request to stay open. Jobs are queued on a bounded thread pool instead; the
+browser polls (or listens on SSE) for progress and downloads the finished
+artifact, which is deleted after a TTL.
+
+A MemoryBudget caps the estimated peak memory of the jobs styling at once, so
+several large merges queue up instead of all holding their decks together.
+
+Each job's state is also written to job.json in its work dir, so when several
+server processes share one job root (e.g. gunicorn workers), whichever process
+receives the status, events or download request can answer it.
+
+Usage:
+  manager = JobManager(workers=2, max_pending=8, ttl_seconds=3600)
+  job = manager.submit(run, tpl_path, input_paths)   # run(job, *args) -> artifact path
+  manager.get(job.id).snapshot()
+
+  budget = MemoryBudget(limit_bytes=2 << 30)
+  with budget.reserve(estimate_job_bytes(paths), timeout=60):
+      ...                                             # build and save the deck
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+STATE_FILE = "job.json"
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by JobManager.submit when the pending-job limit is reached."""
+
+
+class JobTooLarge(RuntimeError):
+    """Raised by MemoryBudget when one job's estimate exceeds the whole budget."""
+
+
+class MemoryBudgetTimeout(RuntimeError):
+    """Raised by MemoryBudget.acquire when the budget does not free up in time."""
+
+
+def estimate_job_bytes(paths: Iterable, factor: float = 3.0) -> int:
+    """
+    Rough peak memory of styling the given uploads: the output deck keeps every
+    picture in memory until it is saved, plus decode and save buffers, so the
+    upload size times factor.
+    """
+    total = 0
+    for p in paths:
+        try:
+            total += Path(p).stat().st_size
+        except OSError:
+            pass
+    return int(total * factor)
+
+
+class MemoryBudget:
+    """
+    Counting semaphore over bytes: acquire(n) waits until n more bytes fit
+    under limit_bytes. A limit of 0 or less disables the budget.
+    """
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = int(limit_bytes)
+        self.in_use = 0
+        self.waits = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, n: int, timeout: Optional[float] = None, on_wait: Optional[Callable] = None):
+        if self.limit_bytes <= 0:
+            return
+        if n > self.limit_bytes:
+            raise JobTooLarge(f"Job needs about {n / 1e6:.0f} MB, over the {self.limit_bytes / 1e6:.0f} MB budget")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self.in_use + n > self.limit_bytes:
+                self.waits += 1
+                if on_wait:
+                    on_wait()
+            while self.in_use + n > self.limit_bytes:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise MemoryBudgetTimeout(f"Memory budget not available within {timeout}s")
+                self._cond.wait(remaining)
+            self.in_use += n
+
+    def release(self, n: int):
+        if self.limit_bytes <= 0:
+            return
+        with self._cond:
+            self.in_use = max(0, self.in_use - n)
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, n: int, timeout: Optional[float] = None, on_wait: Optional[Callable] = None):
+        self.acquire(n, timeout, on_wait)
+        try:
+            yield
+        finally:
+            self.release(n)
+
+
+class Job:
+    """
+    State of one styling job; updated from the worker thread, read by request threads.
+    Jobs loaded from another process's job.json (Job.load) re-read it on every snapshot().
+    """
+
+    def __init__(self, job_id: str, work_dir: Path):
+        self.id = job_id
+        self.work_dir = work_dir
+        self.status = "queued"  # queued | running | done | failed
+        self.stage = "queued"
+        self.done = 0
+        self.total = 0
+        self.error: Optional[str] = None
+        self.artifact: Optional[Path] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.remote = False
+        self._lock = threading.Lock()
+
+    def update(self, stage: Optional[str] = None, done: Optional[int] = None, total: Optional[int] = None):
+        with self._lock:
+            if stage is not None:
+                self.stage = stage
+            if done is not None:
+                self.done = done
+            if total is not None:
+                self.total = total
+        self.save()
+
+    def snapshot(self) -> dict:
+        if self.remote:
+            self._reload()
+        with self._lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "stage": self.stage,
+                "done": self.done,
+                "total": self.total,
+                "error": self.error,
+            }
+
+    def save(self):
+        """Write the job's state to work_dir/job.json (atomically) for other processes."""
+        with self._lock:
+            state = {
+                "status": self.status, "stage": self.stage, "done": self.done, "total": self.total,
+                "error": self.error, "artifact": self.artifact.name if self.artifact else None,
+                "created": self.created, "finished": self.finished,
+            }
+        tmp = self.work_dir / f".{STATE_FILE}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, self.work_dir / STATE_FILE)
+        except OSError:
+            pass  # work dir already cleaned up
+
+    @classmethod
+    def load(cls, work_dir: Path) -> Optional["Job"]:
+        """Job from another process's job.json, or None if there is none."""
+        job = cls(work_dir.name, work_dir)
+        job.remote = True
+        return job if job._reload() else None
+
+    def _reload(self) -> bool:
+        try:
+            state = json.loads((self.work_dir / STATE_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        with self._lock:
+            self.status = state["status"]
+            self.stage = state["stage"]
+            self.done = state["done"]
+            self.total = state["total"]
+            self.error = state["error"]
+            self.artifact = self.work_dir / state["artifact"] if state["artifact"] else None
+            self.created = state["created"]
+            self.finished = state["finished"]
+        return True
+
+
+class JobManager:
+    """
+    Runs jobs on `workers` threads and refuses new ones once `max_pending`
+    jobs are queued or running. Finished jobs (and their work dirs) are
+    removed `ttl_seconds` after completion, including those of other
+    processes sharing `root`.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 8, ttl_seconds: float = 3600,
+                 root: Optional[str] = None):
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self.ttl_seconds = float(ttl_seconds)
+        self.root = Path(root or tempfile.mkdtemp(prefix="pptx-jobs-"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._start()
+
+    def _start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pptx-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._janitor = threading.Thread(target=self._cleanup_loop, name="pptx-job-janitor", daemon=True)
+        self._janitor.start()
+
+    def after_fork(self):
+        """
+        Call in a forked child (e.g. a gunicorn worker): threads do not survive
+        fork, so the executor and janitor are started afresh. The parent's jobs
+        stay readable through their job.json files.
+        """
+        self._start()
+
+    def new_job(self) -> Job:
+        """Reserve a job slot and work dir (for saving uploads) before submit()."""
+        self.cleanup()
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if j.status in ("queued", "running"))
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs already pending")
+            job_id = uuid.uuid4().hex
+            work_dir = self.root / job_id
+            work_dir.mkdir()
+            job = Job(job_id, work_dir)
+            self._jobs[job_id] = job
+        job.save()
+        return job
+
+    def submit(self, job: Job, fn: Callable, *args, **kwargs) -> Job:
+        """Queue fn(job, *args, **kwargs); its return value is the artifact path."""
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def discard(self, job: Job):
+        """Drop a reserved job that was never submitted (e.g. invalid upload)."""
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        shutil.rmtree(job.work_dir, ignore_errors=True)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job of this process, or one another process wrote to the shared root."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and _JOB_ID.fullmatch(job_id or ""):
+            job = Job.load(self.root / job_id)
+        return job
+
+    def _run(self, job: Job, fn: Callable, args, kwargs):
+        job.status = "running"
+        job.save()
+        try:
+            artifact = fn(job, *args, **kwargs)
+            job.artifact = Path(artifact) if artifact else None
+            job.status = "done"
+            job.update(stage="done")
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.error = str(e) or e.__class__.__name__
+            job.status = "failed"
+            job.update(stage="failed")
+        finally:
+            job.finished = time.time()
+            job.save()
+
+    def cleanup(self) -> int:
+        """Remove finished jobs older than the TTL together with their files."""
+        now = time.time()
+        with self._lock:
+            expired = [j for j in self._jobs.values() if j.finished and now - j.finished > self.ttl_seconds]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+        return len(expired) + self._cleanup_shared(now)
+
+    def _cleanup_shared(self, now: float) -> int:
+        """Expire finished jobs under root that belong to other (possibly exited) processes."""
+        removed = 0
+        with self._lock:
+            own = set(self._jobs)
+        for work_dir in self.root.iterdir():
+            if work_dir.name in own or not _JOB_ID.fullmatch(work_dir.name):
+                continue
+            job = Job.load(work_dir)
+            if job and job.finished and now - job.finished > self.ttl_seconds:
+                shutil.rmtree(work_dir, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def _cleanup_loop(self):
+        interval = max(1.0, min(60.0, self.ttl_seconds / 4))
+        while True:
+            time.sleep(interval)
+            try:
+                self.cleanup()
+            except Exception as e:
+                print(f"Job cleanup failed: {e}")
@@ -0,0 +1,178 @@
+"""
+Lightweight stage instrumentation for the styling pipeline.
+
+Hot stages (image decode, OCR, corner rounding, picture insertion, shadows,
+save) are wrapped in `METRICS.stage(name)`, which records wall time, call
+count and bytes in/out; `METRICS.count(name)` records events such as OCR
+fallbacks. While disabled, `stage()` hands back one shared no-op context
+manager, so the cost is an attribute check per call.
+
+Usage:
+  METRICS.enabled = True
+  with METRICS.stage("ocr", bytes_in=len(blob)) as st:
+      ...
+      st.bytes_out = len(result)
+  METRICS.report()       # JSON-friendly dict (CLI --profile)
+  METRICS.prometheus(labels={"worker": os.getpid()})   # text exposition format (web /metrics)
+"""
+
+import bisect
+import threading
+import time
+
+# Upper bounds (seconds) of the stage-duration histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NullStage:
+    """Shared stand-in returned by a disabled Metrics; attribute writes are kept but ignored."""
+
+    bytes_in = 0
+    bytes_out = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("_metrics", "name", "bytes_in", "bytes_out", "_t0")
+
+    def __init__(self, metrics, name, bytes_in):
+        self._metrics = metrics
+        self.name = name
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe(self.name, time.perf_counter() - self._t0, self.bytes_in, self.bytes_out)
+        return False
+
+
+class Metrics:
+    """
+    Thread-safe accumulator of per-stage timings and event counters.
+
+    Stage data is cumulative since creation (or reset()); snapshot()/merge()
+    move it between processes, e.g. from process-pool workers to the parent.
+    """
+
+    def __init__(self, enabled: bool = False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+
+    def stage(self, name: str, bytes_in: int = 0):
+        """Context manager timing one call of stage `name`."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, bytes_in)
+
+    def observe(self, name: str, seconds: float, bytes_in: int = 0, bytes_out: int = 0):
+        with self._lock:
+            st = self._stages.get(name)
+            if st is None:
+                st = self._stages[name] = {
+                    "calls": 0, "seconds": 0.0, "bytes_in": 0, "bytes_out": 0,
+                    "buckets": [0] * (len(self.buckets) + 1),
+                }
+            st["calls"] += 1
+            st["seconds"] += seconds
+            st["bytes_in"] += bytes_in
+            st["bytes_out"] += bytes_out
+            st["buckets"][bisect.bisect_left(self.buckets, seconds)] += 1
+
+    def count(self, name: str, n: int = 1):
+        """Add n to event counter `name` (no-op while disabled)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._counters = {}
+
+    def snapshot(self) -> dict:
+        """Picklable copy of the raw data, for merge() in another process."""
+        with self._lock:
+            return {
+                "stages": {k: dict(v, buckets=list(v["buckets"])) for k, v in self._stages.items()},
+                "counters": dict(self._counters),
+            }
+
+    def merge(self, snap: dict):
+        """Add a snapshot() taken elsewhere (same bucket bounds) into this instance."""
+        if not snap:
+            return
+        with self._lock:
+            for name, other in snap.get("stages", {}).items():
+                st = self._stages.get(name)
+                if st is None:
+                    self._stages[name] = dict(other, buckets=list(other["buckets"]))
+                    continue
+                for key in ("calls", "seconds", "bytes_in", "bytes_out"):
+                    st[key] += other[key]
+                st["buckets"] = [a + b for a, b in zip(st["buckets"], other["buckets"])]
+            for name, n in snap.get("counters", {}).items():
+                self._counters[name] = self._counters.get(name, 0) + n
+
+    def report(self) -> dict:
+        """Per-stage totals and averages plus counters, sorted by time spent."""
+        snap = self.snapshot()
+        stages = {}
+        for name, st in sorted(snap["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+            stages[name] = {
+                "calls": st["calls"],
+                "seconds": round(st["seconds"], 6),
+                "ms_per_call": round(1000 * st["seconds"] / max(1, st["calls"]), 3),
+                "bytes_in": st["bytes_in"],
+                "bytes_out": st["bytes_out"],
+            }
+        return {"stages": stages, "counters": snap["counters"]}
+
+    def prometheus(self, prefix: str = "pptx_stylizer", labels: dict = None) -> str:
+        """
+        Cumulative histograms and counters in the Prometheus text exposition
+        format; labels (e.g. {"worker": pid}) are added to every series.
+        """
+        snap = self.snapshot()
+        extra = "".join(f'{k}="{v}",' for k, v in sorted((labels or {}).items()))
+        lines = [
+            f"# HELP {prefix}_stage_seconds Wall time per pipeline stage call.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for name, st in sorted(snap["stages"].items()):
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), st["buckets"]):
+                running += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_stage_seconds_bucket{{{extra}stage="{name}",le="{le}"}} {running}')
+            lines.append(f'{prefix}_stage_seconds_sum{{{extra}stage="{name}"}} {st["seconds"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{{extra}stage="{name}"}} {st["calls"]}')
+        for key, help_text in (("bytes_in", "Bytes consumed"), ("bytes_out", "Bytes produced")):
+            lines.append(f"# HELP {prefix}_stage_{key}_total {help_text} per pipeline stage.")
+            lines.append(f"# TYPE {prefix}_stage_{key}_total counter")
+            for name, st in sorted(snap["stages"].items()):
+                lines.append(f'{prefix}_stage_{key}_total{{{extra}stage="{name}"}} {st[key]}')
+        lines.append(f"# HELP {prefix}_events_total Pipeline events such as OCR title fallbacks.")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, n in sorted(snap["counters"].items()):
+            lines.append(f'{prefix}_events_total{{{extra}event="{name}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide instance used by style_tableau_pptx; off unless a caller enables it
+METRICS = Metrics()
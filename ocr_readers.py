@@ -0,0 +1,329 @@
+"""
+Shared, process-wide pools of easyocr readers.
+
+Loading an easyocr.Reader pulls the detector and recognizer weights from disk
+and allocates several hundred MB, so the web app keeps a small pool of warm
+readers and hands them out per request instead of building one per POST.
+Each language set needs its own model, so a ReaderRegistry keeps one pool per
+language tuple and, when loading another reader would exceed its memory
+budget, first drops the least recently used idle reader of any language.
+
+Usage:
+  pool = ReaderPool(size=2)
+  pool.warm()                      # at startup, optional
+  with pool.reader(timeout=30) as reader:
+      extract_title_from_image(path, reader)
+
+  registry = ReaderRegistry(size=1, max_mb=2048, reader_mb=400)
+  with registry.pool(("de", "en")).lazy_reader(timeout=30) as reader:
+      ...
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from metrics import METRICS
+
+
+class ReaderUnavailable(RuntimeError):
+    """No OCR reader could be had at all; OCR callers let this through instead of skipping the title."""
+
+
+class ReaderPoolTimeout(ReaderUnavailable):
+    """Raised when no OCR reader became available within the wait budget."""
+
+
+def normalize_langs(langs) -> Tuple[str, ...]:
+    """Language tuple for a list or comma-separated string, lowercased, de-duplicated and sorted ("en" if empty)."""
+    if isinstance(langs, str):
+        langs = langs.split(",")
+    result = sorted({lang.strip().lower() for lang in langs if lang and lang.strip()})
+    return tuple(result) or ("en",)
+
+
+def _default_reader_factory(langs: Sequence[str]):
+    import easyocr
+    return easyocr.Reader(list(langs), gpu=False)
+
+
+def available_memory_mb() -> Optional[float]:
+    """Best-effort MemAvailable from /proc/meminfo; None when unknown."""
+    try:
+        with open("/proc/meminfo") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024.0
+    except Exception:
+        pass
+    return None
+
+
+class ReaderPool:
+    """
+    Thread-safe pool of OCR readers for one language set.
+
+    - size: maximum number of readers alive at once (and concurrent OCR users).
+    - min_free_mb: when available system memory drops below this, idle readers
+      beyond `keep_idle` are evicted on acquire/release and rebuilt on demand.
+    - keep_idle: readers that are never evicted for memory pressure.
+    """
+
+    def __init__(self, langs: Sequence[str] = ("en",), size: int = 1, min_free_mb: float = 512,
+                 keep_idle: int = 1, factory: Optional[Callable] = None, registry=None):
+        self.langs = tuple(langs)
+        self.size = max(1, int(size))
+        self.min_free_mb = float(min_free_mb)
+        self.keep_idle = max(0, int(keep_idle))
+        self._factory = factory or _default_reader_factory
+        self._registry = registry
+        self._cond = threading.Condition()
+        self._idle: List[tuple] = []  # (reader, released_at)
+        self._loaded = 0              # readers alive (idle + checked out)
+        self._loading = 0             # readers being constructed right now
+        self.loads = 0
+        self.evictions = 0
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def warm(self, count: Optional[int] = None):
+        """Eagerly load readers (default: fill the pool) so the first request is fast."""
+        target = self.size if count is None else min(self.size, max(0, int(count)))
+        while True:
+            with self._cond:
+                if self._loaded + self._loading >= target:
+                    return
+                self._loading += 1
+            self._finish_load(self._build())
+
+    def _build(self):
+        try:
+            if self._registry is not None:
+                self._registry.make_room(self)
+            return self._factory(self.langs)
+        except BaseException as e:
+            with self._cond:
+                self._loading -= 1
+                self._cond.notify()
+            if isinstance(e, Exception) and not isinstance(e, ReaderUnavailable):
+                raise ReaderUnavailable(f"could not load the OCR reader for {','.join(self.langs)}: {e}") from e
+            raise
+
+    def _finish_load(self, reader):
+        with self._cond:
+            self._loading -= 1
+            self._loaded += 1
+            self.loads += 1
+            self._idle.append((reader, time.monotonic()))
+            self._cond.notify()
+        METRICS.count("ocr_reader_load")
+
+    # -- checkout ----------------------------------------------------------
+
+    def acquire(self, timeout: Optional[float] = 60.0):
+        """
+        Take a reader, loading one if the pool has headroom; wait at most `timeout` seconds.
+        Idle readers beyond `keep_idle` are trimmed first when memory is tight.
+        """
+        self.trim()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    reader, _ = self._idle.pop()
+                    return reader
+                if self._loaded + self._loading < self.size:
+                    self._loading += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise ReaderPoolTimeout(f"No OCR reader available within {timeout}s")
+                self._cond.wait(remaining)
+        reader = self._build()
+        with self._cond:
+            self._loading -= 1
+            self._loaded += 1
+            self.loads += 1
+        METRICS.count("ocr_reader_load")
+        return reader
+
+    def release(self, reader):
+        """Return a reader to the pool, evicting it instead when memory is tight."""
+        with self._cond:
+            if len(self._idle) >= self.keep_idle and self._memory_tight():
+                self._loaded -= 1
+                self.evictions += 1
+                METRICS.count("ocr_reader_eviction")
+            else:
+                self._idle.append((reader, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def reader(self, timeout: Optional[float] = 60.0):
+        r = self.acquire(timeout)
+        try:
+            yield r
+        finally:
+            self.release(r)
+
+    @contextmanager
+    def lazy_reader(self, timeout: Optional[float] = 60.0, on_wait: Optional[Callable] = None):
+        """
+        Like reader(), but the pool is only checked out on the first OCR call,
+        so work that ends up needing no OCR never waits for (or loads) a reader.
+        on_wait() is called just before checking out.
+        """
+        checkout = _LazyCheckout(self, timeout, on_wait)
+        try:
+            yield checkout
+        finally:
+            checkout.release()
+
+    # -- eviction ----------------------------------------------------------
+
+    def _memory_tight(self) -> bool:
+        free = available_memory_mb()
+        return free is not None and free < self.min_free_mb
+
+    def trim(self, force: bool = False) -> int:
+        """Drop least-recently-used idle readers beyond `keep_idle` if memory is tight (or `force`)."""
+        dropped = 0
+        with self._cond:
+            if not (force or self._memory_tight()):
+                return 0
+            self._idle.sort(key=lambda item: item[1], reverse=True)
+            while len(self._idle) > self.keep_idle:
+                self._idle.pop()
+                self._loaded -= 1
+                self.evictions += 1
+                dropped += 1
+            self._cond.notify_all()
+        if dropped:
+            METRICS.count("ocr_reader_eviction", dropped)
+        return dropped
+
+    def alive(self) -> int:
+        """Readers loaded or being loaded."""
+        with self._cond:
+            return self._loaded + self._loading
+
+    def oldest_idle(self) -> Optional[float]:
+        """When the least recently used idle reader was released, or None without idle readers."""
+        with self._cond:
+            return min((released for _, released in self._idle), default=None)
+
+    def evict_oldest_idle(self) -> bool:
+        """Drop the least recently used idle reader (keep_idle does not apply); False when none is idle."""
+        with self._cond:
+            if not self._idle:
+                return False
+            oldest = min(range(len(self._idle)), key=lambda i: self._idle[i][1])
+            self._idle.pop(oldest)
+            self._loaded -= 1
+            self.evictions += 1
+            self._cond.notify_all()
+        METRICS.count("ocr_reader_eviction")
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "langs": list(self.langs),
+                "size": self.size,
+                "loaded": self._loaded,
+                "idle": len(self._idle),
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+
+class _LazyCheckout:
+    """Reader stand-in handed out by ReaderPool.lazy_reader."""
+
+    def __init__(self, pool: ReaderPool, timeout: Optional[float], on_wait: Optional[Callable]):
+        self._pool = pool
+        self._timeout = timeout
+        self._on_wait = on_wait
+        self._reader = None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._reader is None:
+            if self._on_wait:
+                self._on_wait()
+            self._reader = self._pool.acquire(self._timeout)
+        return getattr(self._reader, name)
+
+    def release(self):
+        if self._reader is not None:
+            reader, self._reader = self._reader, None
+            self._pool.release(reader)
+
+
+class ReaderRegistry:
+    """
+    One ReaderPool per language set, created on first use and reused across
+    jobs. Readers of all pools share a memory budget: each is estimated at
+    reader_mb, and before a reader is loaded past max_mb the least recently
+    used idle readers (of any language) are evicted. When every reader is busy
+    the new one is loaded anyway and the budget is temporarily exceeded.
+    max_mb <= 0 disables the budget. Pool options (size, min_free_mb, ...)
+    apply to every pool.
+    """
+
+    def __init__(self, max_mb: float = 0, reader_mb: float = 400, **pool_options):
+        self.max_mb = float(max_mb)
+        self.reader_mb = float(reader_mb)
+        self._pool_options = pool_options
+        self._pools: Dict[Tuple[str, ...], ReaderPool] = {}
+        self._lock = threading.Lock()
+
+    def pool(self, langs=("en",)) -> ReaderPool:
+        """The pool for a language set (order and case do not matter)."""
+        key = normalize_langs(langs)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = ReaderPool(key, registry=self, **self._pool_options)
+            return pool
+
+    def make_room(self, loading: ReaderPool):
+        """Called by a pool just before it loads a reader (already counted in its alive())."""
+        if self.max_mb <= 0:
+            return
+        with self._lock:
+            pools = list(self._pools.values())
+            while sum(p.alive() for p in pools) * self.reader_mb > self.max_mb:
+                idle = [(p.oldest_idle(), p) for p in pools]
+                idle = [(t, p) for t, p in idle if t is not None]
+                if not idle:
+                    print(f"Warning: OCR readers exceed the {self.max_mb:.0f} MB budget; all are in use")
+                    return
+                min(idle, key=lambda item: item[0])[1].evict_oldest_idle()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pools = [p.stats() for p in self._pools.values()]
+        return {
+            "max_mb": self.max_mb,
+            "reader_mb": self.reader_mb,
+            "loads": sum(p["loads"] for p in pools),
+            "evictions": sum(p["evictions"] for p in pools),
+            "pools": pools,
+        }
+
+
+def registry_from_env() -> ReaderRegistry:
+    """
+    Build a registry configured by PPTX_OCR_MEMORY_MB / PPTX_OCR_READER_MB
+    plus the per-pool PPTX_OCR_POOL_SIZE / PPTX_OCR_MIN_FREE_MB.
+    """
+    return ReaderRegistry(
+        max_mb=float(os.environ.get("PPTX_OCR_MEMORY_MB", "2048")),
+        reader_mb=float(os.environ.get("PPTX_OCR_READER_MB", "400")),
+        size=int(os.environ.get("PPTX_OCR_POOL_SIZE", "1")),
+        min_free_mb=float(os.environ.get("PPTX_OCR_MIN_FREE_MB", "512")),
+    )
@@ -0,0 +1,123 @@
+"""
+Save a presentation with control over how its zip entries are compressed.
+
+python-pptx deflates every part at zlib's default level, including PNG/JPEG
+media that are already compressed, so on picture-heavy decks most of the save
+goes to re-deflating images for next to no size gain. save_pptx() deflates the
+XML parts at a chosen level and, with store_media, writes media that deflate
+would not shrink as ZIP_STORED. Audio/video and embedded Office files are
+always stored. Pictures are not, because flat-colour dashboards deflate well
+even as PNG or JPEG: a picture larger than 16 KB is stored only when a level-1
+trial deflate of its first 16 KB saves under 10%. Smaller ones (cheap either
+way) keep being deflated. The pictures of one export are much alike, so once
+eight of a type in a row get the same verdict the rest of that save reuses it.
+
+Usage:
+  save_pptx(prs, "styled.pptx", zip_level=6, store_media=True)
+  save_pptx(prs, buf, zip_level=1)                # faster, slightly larger XML
+"""
+
+import zipfile
+import zlib
+
+try:
+    from pptx.opc.serialized import PackageWriter
+except ImportError:  # python-pptx before the opc.serialized module
+    PackageWriter = None
+
+from metrics import METRICS
+
+DEFAULT_ZIP_LEVEL = 6
+# Audio/video and embedded Office/zip files: deflate cannot shrink these
+STORED_EXTS = frozenset((
+    "mp3", "m4a", "wma", "mp4", "m4v", "mov", "wmv",
+    "xlsx", "xlsm", "docx", "pptx", "zip",
+))
+# Compressed pictures, stored only when a trial deflate says deflating them again would not pay
+PROBED_EXTS = frozenset(("png", "gif", "jpg", "jpeg", "jpe", "jfif", "webp", "wdp"))
+PROBE_BYTES = 16 * 1024
+STORE_MAX_RATIO = 0.9
+SETTLE_AFTER = 8
+
+_warned = False
+
+
+def worth_storing(ext: str, blob: bytes) -> bool:
+    """Whether a part with this extension and content should be written uncompressed."""
+    ext = ext.lower()
+    if ext in STORED_EXTS:
+        return True
+    if ext not in PROBED_EXTS or len(blob) <= PROBE_BYTES:
+        return False
+    head = blob[:PROBE_BYTES]
+    return len(zlib.compress(head, 1)) > STORE_MAX_RATIO * len(head)
+
+
+class _Verdicts:
+    """worth_storing() per extension until SETTLE_AFTER probes in a row agree, then that answer."""
+
+    def __init__(self):
+        self._streaks = {}  # ext -> (verdict, count)
+
+    def __call__(self, ext: str, blob: bytes) -> bool:
+        ext = ext.lower()
+        if ext not in PROBED_EXTS or len(blob) <= PROBE_BYTES:
+            return worth_storing(ext, blob)
+        verdict, count = self._streaks.get(ext, (None, 0))
+        if count >= SETTLE_AFTER:
+            return verdict
+        probed = worth_storing(ext, blob)
+        self._streaks[ext] = (probed, count + 1 if probed == verdict else 1)
+        return probed
+
+
+class _ZipWriter:
+    """Physical package writer for python-pptx's PackageWriter with per-entry compression."""
+
+    def __init__(self, pkg_file, zip_level: int, store_media: bool):
+        self.zip_level = zip_level
+        self.store_media = store_media
+        self.stored = 0
+        self._verdicts = _Verdicts()
+        compression = zipfile.ZIP_DEFLATED if zip_level > 0 else zipfile.ZIP_STORED
+        self._zipf = zipfile.ZipFile(pkg_file, "w", compression=compression,
+                                     compresslevel=zip_level if zip_level > 0 else None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._zipf.close()
+
+    def write(self, pack_uri, blob):
+        if self.zip_level > 0 and self.store_media and self._verdicts(pack_uri.ext, blob):
+            self._zipf.writestr(pack_uri.membername, blob, compress_type=zipfile.ZIP_STORED)
+            self.stored += 1
+            return
+        self._zipf.writestr(pack_uri.membername, blob)
+
+
+def save_pptx(prs, target, zip_level: int = DEFAULT_ZIP_LEVEL, store_media: bool = False):
+    """
+    prs.save(target) with XML deflated at zip_level (0 stores everything) and,
+    with store_media, incompressible media stored. Returns the number of parts stored.
+    """
+    global _warned
+    if zip_level == DEFAULT_ZIP_LEVEL and not store_media:
+        prs.save(target)
+        return 0
+    if PackageWriter is None:
+        if not _warned:
+            print("Warning: this python-pptx cannot save with --zip-level/--store-media; using its default compression")
+            _warned = True
+        prs.save(target)
+        return 0
+    package = prs.part.package
+    writer = PackageWriter(target, package._rels, tuple(package.iter_parts()))
+    with _ZipWriter(target, int(zip_level), store_media) as phys_writer:
+        writer._write_content_types_stream(phys_writer)
+        writer._write_pkg_rels(phys_writer)
+        writer._write_parts(phys_writer)
+    if phys_writer.stored:
+        METRICS.count("zip_media_stored", phys_writer.stored)
+    return phys_writer.stored
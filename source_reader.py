@@ -0,0 +1,135 @@
+"""
+Lightweight, lazy reader for Tableau-exported source decks.
+
+Tableau exports carry one dashboard picture per slide, so building the whole
+python-pptx object graph just to find it is wasted work. This reader opens the
+PPTX zip directly, follows presentation.xml -> slide -> picture relationships,
+and yields one slide at a time, keeping only that slide's XML and image bytes
+in memory.
+
+Usage:
+  for idx, image_bytes, fallback_text in iter_source_slides("export.pptx"):
+      ...
+"""
+
+import posixpath
+import zipfile
+from typing import Iterator, List, Optional, Tuple
+
+from lxml import etree
+
+_NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_R_EMBED = "{%s}embed" % _NS["r"]
+_R_ID = "{%s}id" % _NS["r"]
+
+
+def _rels_name(partname: str) -> str:
+    folder, name = posixpath.split(partname)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+
+def _read_rels(zf: zipfile.ZipFile, partname: str) -> dict:
+    """Map rId -> absolute part name for internal relationships of partname."""
+    try:
+        root = etree.fromstring(zf.read(_rels_name(partname)))
+    except KeyError:
+        return {}
+    base = posixpath.dirname(partname)
+    rels = {}
+    for rel in root.iterfind("rel:Relationship", _NS):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            rels[rel.get("Id")] = target.lstrip("/")
+        else:
+            rels[rel.get("Id")] = posixpath.normpath(posixpath.join(base, target))
+    return rels
+
+
+def _slide_partnames(zf: zipfile.ZipFile) -> List[str]:
+    """Slide part names in presentation order (p:sldIdLst)."""
+    pres = "ppt/presentation.xml"
+    rels = _read_rels(zf, pres)
+    root = etree.fromstring(zf.read(pres))
+    return [rels[sld.get(_R_ID)] for sld in root.iterfind("p:sldIdLst/p:sldId", _NS) if sld.get(_R_ID) in rels]
+
+
+def _shape_text(sp) -> str:
+    """Shape text the way python-pptx renders it: paragraphs joined by newlines, line breaks as \\v."""
+    paragraphs = []
+    for p in sp.iterfind("p:txBody/a:p", _NS):
+        parts = []
+        for child in p:
+            tag = etree.QName(child).localname
+            if tag in ("r", "fld"):
+                parts.append("".join(child.itertext()))
+            elif tag == "br":
+                parts.append("\v")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def _first_picture_and_text(slide_root) -> Tuple[Optional[str], Optional[str]]:
+    """(rId of the first top-level picture, first non-empty text line) for a slide."""
+    rid, text = None, None
+    tree = slide_root.find("p:cSld/p:spTree", _NS)
+    if tree is None:
+        return None, None
+    for shape in tree:
+        tag = etree.QName(shape).localname
+        if rid is None and tag == "pic":
+            blip = shape.find("p:blipFill/a:blip", _NS)
+            if blip is not None and blip.get(_R_EMBED):
+                rid = blip.get(_R_EMBED)
+        elif text is None and tag == "sp" and shape.find("p:txBody", _NS) is not None:
+            txt = _shape_text(shape).strip()
+            if txt:
+                text = txt.splitlines()[0][:120]
+        if rid is not None and text is not None:
+            break
+    return rid, text
+
+
+def count_source_slides(path) -> int:
+    """Number of slides in a deck, read from presentation.xml only."""
+    with zipfile.ZipFile(str(path)) as zf:
+        return len(_slide_partnames(zf))
+
+
+def picture_slide_indices(path, start: int = 1) -> List[int]:
+    """Indices of slides that carry a picture, from slide XML only (no media is read)."""
+    with zipfile.ZipFile(str(path)) as zf:
+        indices = []
+        for idx, partname in enumerate(_slide_partnames(zf), start=start):
+            rid, _ = _first_picture_and_text(etree.fromstring(zf.read(partname)))
+            if rid is not None:
+                indices.append(idx)
+        return indices
+
+
+def iter_source_slides(path, start: int = 1) -> Iterator[Tuple[int, Optional[bytes], Optional[str]]]:
+    """
+    Yield (slide_index, image_bytes, fallback_text) per slide, lazily.
+    image_bytes is the first picture's media part (None when the slide has no
+    picture); fallback_text matches guess_title_from_slide on the same slide.
+    """
+    with zipfile.ZipFile(str(path)) as zf:
+        for idx, partname in enumerate(_slide_partnames(zf), start=start):
+            root = etree.fromstring(zf.read(partname))
+            rid, text = _first_picture_and_text(root)
+            blob = None
+            if rid is not None:
+                media = _read_rels(zf, partname).get(rid)
+                if media:
+                    try:
+                        blob = zf.read(media)
+                    except KeyError:
+                        blob = None
+            del root
+            yield idx, blob, text
@@ -1,28 +1,92 @@
-from flask import Flask, render_template_string, request, send_file
+from flask import Flask, Response, jsonify, render_template_string, request, send_file
 from werkzeug.utils import secure_filename
 from pathlib import Path
 import tempfile
+import json
+import time
+import gc
 import os
-import io
+import re
 
 
 from style_tableau_pptx import (
-    Presentation,
-    Inches,
-    Pt,
-    apply_title_case,
-    guess_title_from_slide,
-    extract_title_from_image,
+    process_slides_serial,
+    resolve_title,
+    add_styled_slide,
+    BulkSlideWriter,
     find_layout,
     add_slide_number,
-    add_rounded_corners,
-    fit_image_on_blank,
-    apply_box_shadow,
+    target_height_px,
+    save_presentation,
+    PictureBytes,
+    TITLE_SOURCES,
+    match_workbook_titles,
+    workbook_title,
 )
-import easyocr
+from metrics import METRICS
+from source_reader import count_source_slides, iter_source_slides
+from ocr_readers import ReaderPoolTimeout, normalize_langs, registry_from_env
+from title_cache import TitleCache, default_cache_dir
+from jobs import JobManager, JobQueueFull, JobTooLarge, MemoryBudget, MemoryBudgetTimeout, estimate_job_bytes
+from workbook_titles import WorkbookTitles
+from template_cache import TemplateCache
+from style_profile import CORNER_MODES, TITLE_CASES, StyleProfile
+from image_encoding import IMAGE_ENCODINGS
 
 app = Flask(__name__)
 
+# Stage timings for /metrics (disable with PPTX_METRICS=0)
+METRICS.enabled = os.environ.get('PPTX_METRICS', '1') != '0'
+
+# Warm OCR readers shared by all requests, one pool per language set (size via PPTX_OCR_POOL_SIZE),
+# all within PPTX_OCR_MEMORY_MB; PPTX_OCR_LANGS is the form's default
+READERS = registry_from_env()
+DEFAULT_LANGS = normalize_langs(os.environ.get('PPTX_OCR_LANGS', 'en'))
+MAX_OCR_LANGS = 5
+READER_WAIT_SECONDS = float(os.environ.get('PPTX_OCR_WAIT_SECONDS', '60'))
+OCR_BATCH_SIZE = int(os.environ.get('PPTX_OCR_BATCH_SIZE', '8'))
+# 'fast' recognizes the title line without easyocr's text detector (see --ocr-mode)
+OCR_MODE = os.environ.get('PPTX_OCR_MODE', 'full')
+# 'bulk' stamps slides from a prototype; 'api' builds each slide through python-pptx shapes
+ASSEMBLY = os.environ.get('PPTX_ASSEMBLY', 'bulk')
+
+# Picture encoding: 'truecolor', 'palette' or 'smallest', as for the CLI's --image-encoding / --png-level / --png-optimize
+IMAGE_ENCODING = os.environ.get('PPTX_IMAGE_ENCODING', 'truecolor')
+if IMAGE_ENCODING not in IMAGE_ENCODINGS:
+    print(f"Warning: unknown PPTX_IMAGE_ENCODING {IMAGE_ENCODING!r}, using truecolor")
+    IMAGE_ENCODING = 'truecolor'
+PNG_LEVEL = min(9, max(0, int(os.environ.get('PPTX_PNG_LEVEL', '6'))))
+PNG_OPTIMIZE = os.environ.get('PPTX_PNG_OPTIMIZE', '0') != '0'
+
+# Output zip: deflate level for XML parts, and whether already-compressed pictures are stored as-is
+ZIP_LEVEL = min(9, max(0, int(os.environ.get('PPTX_ZIP_LEVEL', '6'))))
+STORE_MEDIA = os.environ.get('PPTX_STORE_MEDIA', '1') != '0'
+
+# Persistent OCR title cache shared with the CLI (disable with PPTX_STYLIZER_CACHE=0)
+TITLE_CACHE = TitleCache(default_cache_dir()) if os.environ.get('PPTX_STYLIZER_CACHE', '1') != '0' else None
+
+# House style shown as the form's defaults, from a JSON/YAML profile shared with the CLI's --style-profile
+STYLE_PROFILE = StyleProfile.load(os.environ['PPTX_STYLE_PROFILE']) if os.environ.get('PPTX_STYLE_PROFILE') else StyleProfile()
+
+# Parsed brand templates keyed by content hash; each request styles onto a copy
+TEMPLATE_CACHE = TemplateCache(find_layout, max_bytes=int(float(os.environ.get('PPTX_TEMPLATE_CACHE_MB', '64')) * (1 << 20)))
+
+# Estimated memory of the decks being styled at once; jobs over it queue (0 disables)
+MEMORY_BUDGET = MemoryBudget(int(float(os.environ.get('PPTX_JOB_MEMORY_MB', '2048')) * (1 << 20)))
+JOB_MEMORY_FACTOR = float(os.environ.get('PPTX_JOB_MEMORY_FACTOR', '3'))
+# Outputs up to this size stay in memory before spilling to a temp file; responses stream in chunks
+SPOOL_MAX_BYTES = int(float(os.environ.get('PPTX_SPOOL_MAX_MB', '16')) * (1 << 20))
+STREAM_CHUNK_BYTES = 256 * 1024
+
+# Background styling jobs: bounded workers and queue, finished artifacts expire after a TTL.
+# Server processes sharing PPTX_JOB_ROOT can answer for each other's jobs.
+JOBS = JobManager(
+    workers=int(os.environ.get('PPTX_JOB_WORKERS', '2')),
+    max_pending=int(os.environ.get('PPTX_JOB_MAX_PENDING', '8')),
+    ttl_seconds=float(os.environ.get('PPTX_JOB_TTL_SECONDS', '3600')),
+    root=os.environ.get('PPTX_JOB_ROOT') or None,
+)
+
 @app.get('/hero.png')
 def hero_png():
     hero_path = Path(__file__).parent / 'assets' / 'hero_image.png'
@@ -138,69 +202,95 @@ FORM = """
               <input id=\"inInput\" type=\"file\" accept=\".pptx\" multiple />
               <ul id=\"fileList\" class=\"file-list\"></ul>
             </div>
+            <div>
+              <label>Tableau Workbook (optional)</label>
+              <div id=\"wbDrop\" class=\"drop\">
+                <div><strong>Drop workbook</strong> or <button class=\"btn\" type=\"button\" id=\"wbPick\">Browse</button></div>
+                <div class=\"muted\">Titles come from the workbook instead of OCR. Accepted: .twb, .twbx</div>
+              </div>
+              <input id=\"wbInput\" type=\"file\" accept=\".twb,.twbx\" />
+              <div id=\"wbName\" class=\"muted\"></div>
+            </div>
           </div>
         </div>
 
         <div class=\"card\">
           <h3>Options</h3>
           <div class=\"stack\">
-            <div class=\"row\">
+            <div class=\"row-4\">
+              <div>
+                <label>Title Source</label>
+                <select id=\"title_source\" class=\"input\">
+                  <option value=\"ocr\" selected>ocr</option>
+                  <option value=\"auto\">auto (slide text, else ocr)</option>
+                  <option value=\"text\">text (no ocr)</option>
+                </select>
+              </div>
+              <div>
+                <label>OCR Languages</label>
+                <input id=\"ocr_langs\" class=\"input\" type=\"text\" value=\"{{ ocr_langs }}\" placeholder=\"en,de\" />
+              </div>
               <div>
                 <label>Title Case</label>
                 <select id=\"title_case\" class=\"input\">
-                  <option value=\"smart\" selected>smart</option>
-                  <option value=\"camel\">camel</option>
-                  <option value=\"upper\">upper</option>
-                  <option value=\"lower\">lower</option>
+                  {% for mode in title_cases %}<option value=\"{{ mode }}\"{% if mode == profile.title_case %} selected{% endif %}>{{ mode }}</option>{% endfor %}
                 </select>
               </div>
               <div>
                 <label>Title Font Size</label>
-                <input id=\"title_font_size\" class=\"input\" type=\"number\" value=\"28\" min=\"10\" max=\"80\" />
+                <input id=\"title_font_size\" class=\"input\" type=\"number\" value=\"{{ profile.title_font_size }}\" min=\"10\" max=\"80\" />
               </div>
             </div>
 
-            <div class=\"row\">
+            <div class=\"row-3\">
               <div>
                 <label>Border Radius (px)</label>
-                <input id=\"border_radius\" class=\"input\" type=\"number\" value=\"10\" min=\"0\" max=\"40\" />
+                <input id=\"border_radius\" class=\"input\" type=\"number\" value=\"{{ profile.border_radius }}\" min=\"0\" max=\"40\" />
+              </div>
+              <div>
+                <label>Corner Mode</label>
+                <select id=\"corner_mode\" class=\"input\">{% for mode in corner_modes %}<option value=\"{{ mode }}\"{% if mode == profile.corner_mode %} selected{% endif %}>{{ mode }}</option>{% endfor %}</select>
               </div>
               <div>
                 <label>Shadow Enabled</label>
-                <select id=\"shadow\" class=\"input\"><option value=\"on\" selected>on</option><option value=\"off\">off</option></select>
+                <select id=\"shadow\" class=\"input\"><option value=\"on\"{% if profile.shadow %} selected{% endif %}>on</option><option value=\"off\"{% if not profile.shadow %} selected{% endif %}>off</option></select>
               </div>
             </div>
 
             <div class=\"row-4\">
               <div>
                 <label>Shadow Color</label>
-                <input id=\"shadow_color\" class=\"color\" type=\"color\" value=\"#000000\" />
+                <input id=\"shadow_color\" class=\"color\" type=\"color\" value=\"#{{ values.shadow_color }}\" />
               </div>
               <div>
                 <label>Transparency</label>
-                <input id=\"shadow_transparency\" class=\"input\" type=\"number\" step=\"0.05\" value=\"0.8\" />
+                <input id=\"shadow_transparency\" class=\"input\" type=\"number\" step=\"0.05\" value=\"{{ values.shadow_transparency }}\" />
               </div>
               <div>
                 <label>Blur (pt)</label>
-                <input id=\"shadow_blur\" class=\"input\" type=\"number\" value=\"15\" />
+                <input id=\"shadow_blur\" class=\"input\" type=\"number\" value=\"{{ values.shadow_blur }}\" />
               </div>
               <div>
                 <label>Angle (deg)</label>
-                <input id=\"shadow_angle\" class=\"input\" type=\"number\" value=\"34\" />
+                <input id=\"shadow_angle\" class=\"input\" type=\"number\" value=\"{{ values.shadow_angle }}\" />
               </div>
             </div>
-            <div class=\"row-3\">
+            <div class=\"row-4\">
               <div>
                 <label>Distance (pt)</label>
-                <input id=\"shadow_distance\" class=\"input\" type=\"number\" value=\"3\" />
+                <input id=\"shadow_distance\" class=\"input\" type=\"number\" value=\"{{ values.shadow_distance }}\" />
               </div>
               <div>
                 <label>Image Left (in)</label>
-                <input id=\"image_left\" class=\"input\" type=\"number\" step=\"0.1\" value=\"2.5\" />
+                <input id=\"image_left\" class=\"input\" type=\"number\" step=\"0.1\" value=\"{{ profile.image_left }}\" />
               </div>
               <div>
                 <label>Image Top (in)</label>
-                <input id=\"image_top\" class=\"input\" type=\"number\" step=\"0.1\" value=\"1.7\" />
+                <input id=\"image_top\" class=\"input\" type=\"number\" step=\"0.1\" value=\"{{ profile.image_top }}\" />
+              </div>
+              <div>
+                <label>Target DPI (0 = off)</label>
+                <input id=\"target_dpi\" class=\"input\" type=\"number\" value=\"0\" min=\"0\" step=\"10\" />
               </div>
             </div>
 
@@ -228,6 +318,10 @@ FORM = """
       const downloadArea = document.getElementById('downloadArea');
 
       let templateFile = null;
+      let workbookFile = null;
+      const wbInput = document.getElementById('wbInput');
+      const wbDrop = document.getElementById('wbDrop');
+      const wbName = document.getElementById('wbName');
       let inputFiles = [];
 
       function fmtSize(bytes){
@@ -276,6 +370,7 @@ FORM = """
       function handleDrop(zone, files){
         zone.classList.remove('drag');
         if(zone===tplDrop){ templateFile = files[0]; tplName.textContent = templateFile ? `${templateFile.name} (${fmtSize(templateFile.size)})` : ''; }
+        else if(zone===wbDrop){ workbookFile = files[0]; wbName.textContent = workbookFile ? `${workbookFile.name} (${fmtSize(workbookFile.size)})` : ''; }
         else { inputFiles.push(...[...files]); renderList(); bindDnD(); }
       }
 
@@ -289,9 +384,39 @@ FORM = """
 
       wireDrop(tplDrop, tplInput);
       wireDrop(inDrop, inInput);
+      wireDrop(wbDrop, wbInput);
+
+      function showProgress(snap){
+        const pct = snap.total ? ` ${snap.done}/${snap.total}` : '';
+        statusEl.textContent = `${snap.stage}${pct}`;
+      }
+
+      // Follow a job via Server-Sent Events, falling back to polling
+      function waitForJob(info){
+        return new Promise((resolve, reject) => {
+          const finished = snap => snap.status === 'done' || snap.status === 'failed';
+          const poll = async () => {
+            try{
+              const r = await fetch(info.status_url);
+              const snap = await r.json();
+              if(!r.ok) return reject(new Error(snap.error || 'Job lost'));
+              showProgress(snap);
+              if(finished(snap)) resolve(snap); else setTimeout(poll, 1000);
+            } catch(e){ reject(e); }
+          };
+          if(!window.EventSource){ poll(); return; }
+          const es = new EventSource(info.events_url);
+          es.onmessage = ev => {
+            const snap = JSON.parse(ev.data);
+            showProgress(snap);
+            if(finished(snap)){ es.close(); resolve(snap); }
+          };
+          es.onerror = () => { es.close(); poll(); };
+        });
+      }
 
       processBtn.addEventListener('click', async ()=>{
-        statusEl.textContent = 'Processing...';
+        statusEl.textContent = 'Uploading...';
         processBtn.disabled = true;
         downloadArea.innerHTML = '';
         try{
@@ -301,12 +426,16 @@ FORM = """
           const fd = new FormData();
           fd.append('template', templateFile, templateFile.name);
           inputFiles.forEach(f => fd.append('inputs', f, f.name));
+          if(workbookFile) fd.append('workbook', workbookFile, workbookFile.name);
 
           const get = id => document.getElementById(id);
           const colorHex = get('shadow_color').value.replace('#','');
+          fd.append('title_source', get('title_source').value);
+          fd.append('ocr_langs', get('ocr_langs').value);
           fd.append('title_case', get('title_case').value);
           fd.append('title_font_size', get('title_font_size').value);
           fd.append('border_radius', get('border_radius').value);
+          fd.append('corner_mode', get('corner_mode').value);
           fd.append('shadow', get('shadow').value === 'on' ? 'on' : 'off');
           fd.append('shadow_color', colorHex);
           fd.append('shadow_transparency', get('shadow_transparency').value);
@@ -315,17 +444,18 @@ FORM = """
           fd.append('shadow_distance', get('shadow_distance').value);
           fd.append('image_left', get('image_left').value);
           fd.append('image_top', get('image_top').value);
+          fd.append('target_dpi', get('target_dpi').value);
 
-          const resp = await fetch('/', { method: 'POST', body: fd });
-          if(!resp.ok) throw new Error('Server error');
-          const blob = await resp.blob();
-          const url = URL.createObjectURL(blob);
+          const resp = await fetch('/jobs', { method: 'POST', body: fd });
+          const info = await resp.json().catch(() => ({}));
+          if(!resp.ok) throw new Error(info.error || 'Server error');
+          const final = await waitForJob(info);
+          if(final.status !== 'done') throw new Error(final.error || 'Processing failed');
           const a = document.createElement('a');
-          a.href = url; a.download = 'styled_output.pptx';
+          a.href = info.download_url; a.download = 'styled_output.pptx';
           a.click();
-          URL.revokeObjectURL(url);
           statusEl.textContent = 'Done';
-          downloadArea.innerHTML = '<span class="pill">Saved: styled_output.pptx</span>';
+          downloadArea.innerHTML = `<span class="pill">Saved: styled_output.pptx</span> <a class="muted" href="${info.download_url}">Download again</a>`;
         } catch(err){
           statusEl.textContent = err.message || 'Error';
         } finally {
@@ -337,113 +467,374 @@ FORM = """
  </html>
 """
 
+PPTX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+
+def _save_uploads(dest):
+    """Save the request's template and input decks into dest; returns (tpl_path, input_paths, error)."""
+    tpl_file = request.files.get('template')
+    if not tpl_file:
+        return None, None, 'Missing template'
+    tpl_path = dest / ('template_' + secure_filename(tpl_file.filename))
+    tpl_file.save(tpl_path)
+
+    inputs = request.files.getlist('inputs')
+    if not inputs:
+        return None, None, 'No inputs'
+    input_paths = []
+    for i, f in enumerate(inputs):
+        # Prefix keeps upload order and same-named decks apart
+        p = dest / f"{i:03d}_{secure_filename(f.filename)}"
+        f.save(p)
+        input_paths.append(p)
+    return tpl_path, input_paths, None
+
+
+def _save_workbook(dest):
+    """Save the request's optional Tableau workbook into dest; returns its path or None."""
+    wb_file = request.files.get('workbook')
+    if not wb_file or not wb_file.filename:
+        return None
+    wb_path = dest / ('workbook_' + secure_filename(wb_file.filename))
+    wb_file.save(wb_path)
+    return wb_path
+
+
+def _parse_options(form):
+    """
+    Request options; styling fields missing from the form keep STYLE_PROFILE's
+    values, except shadow, which is off unless sent as "on" (the profile only
+    preselects it in the form).
+    """
+    defaults = STYLE_PROFILE.as_dict()
+    corner_mode = form.get('corner_mode', defaults['corner_mode'])
+    if corner_mode not in CORNER_MODES:
+        corner_mode = 'vector'
+    title_source = form.get('title_source', 'ocr')
+    if title_source not in TITLE_SOURCES:
+        title_source = 'ocr'
+    ocr_langs = normalize_langs(form.get('ocr_langs', '')) if form.get('ocr_langs', '').strip() else DEFAULT_LANGS
+    if len(ocr_langs) > MAX_OCR_LANGS or not all(re.fullmatch(r'[a-z_]{2,10}', lang) for lang in ocr_langs):
+        ocr_langs = DEFAULT_LANGS
+    profile = StyleProfile(
+        title_case=form.get('title_case', defaults['title_case']),
+        title_font_size=int(form.get('title_font_size', defaults['title_font_size'])),
+        border_radius=int(form.get('border_radius', defaults['border_radius'])),
+        corner_mode=corner_mode,
+        shadow=form.get('shadow') == 'on',
+        shadow_color=form.get('shadow_color', defaults['shadow_color']),
+        shadow_transparency=float(form.get('shadow_transparency', defaults['shadow_transparency'])),
+        shadow_blur=int(form.get('shadow_blur', defaults['shadow_blur'])),
+        shadow_angle=int(form.get('shadow_angle', defaults['shadow_angle'])),
+        shadow_distance=int(form.get('shadow_distance', defaults['shadow_distance'])),
+        image_left=float(form.get('image_left', defaults['image_left'])),
+        image_top=float(form.get('image_top', defaults['image_top'])),
+    )
+    return {
+        'title_source': title_source,
+        'ocr_langs': ocr_langs,
+        'profile': profile,
+        'target_dpi': int(form.get('target_dpi', 0) or 0),
+    }
+
+
+def _iter_input_slides(input_paths, counts):
+    """
+    Slides of all input decks in order, numbered continuously, read lazily.
+    Each uploaded deck is deleted as soon as its last slide has been read.
+    """
+    start = 1
+    for in_path, count in zip(input_paths, counts):
+        yield from iter_source_slides(in_path, start=start)
+        start += count
+        try:
+            os.remove(in_path)
+        except OSError:
+            pass
+
+
+def _job_memory(tpl_path, input_paths, workbook_path=None):
+    return estimate_job_bytes([tpl_path, *input_paths, *([workbook_path] if workbook_path else [])],
+                              JOB_MEMORY_FACTOR)
+
+
+def _stream_file(fh):
+    """Yield an open file's contents in STREAM_CHUNK_BYTES pieces, closing it at the end."""
+    try:
+        fh.seek(0)
+        while True:
+            chunk = fh.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        fh.close()
+
+
+def build_styled_deck(tpl_path, input_paths, opts, progress=None, workbook_path=None):
+    """
+    Style and merge input_paths onto the template; returns the output Presentation.
+    Source decks are streamed one OCR batch at a time (batches span deck boundaries).
+    With a workbook, each deck whose picture slides line up with the workbook's
+    sheets is titled from it; other slides are OCR'd and snapped to its titles.
+    progress(stage, done, total) is called as slides complete.
+    OCR uses the reader pool for opts['ocr_langs'].
+    Raises ReaderPoolTimeout when no OCR reader frees up in time; title_source
+    'text' styles without borrowing a reader at all.
+    """
+    report = progress or (lambda stage, done, total: None)
+
+    out, layout = TEMPLATE_CACHE.checkout(tpl_path)
+    add_slide_number(out)
+
+    profile = opts['profile']
+
+    counts = [count_source_slides(p) for p in input_paths]
+    total = sum(counts)
+
+    workbook = None
+    if workbook_path:
+        try:
+            workbook = WorkbookTitles.load(workbook_path)
+        except Exception as e:
+            print(f"Warning: could not read workbook {Path(workbook_path).name}, using OCR titles: {e}")
+    known_titles = {}
+    start = 1
+    for in_path, count in zip(input_paths, counts):
+        known_titles.update(match_workbook_titles(workbook, in_path, start=start))
+        start += count
+
+    # OCR with a warm reader borrowed from the shared pool, checked out only once
+    # a slide actually needs OCR (text titles and workbook matches never wait for one)
+    done = 0
+    on_wait = lambda: report('waiting for OCR', done, total)
+    langs = opts['ocr_langs']
+    with READERS.pool(langs).lazy_reader(timeout=READER_WAIT_SECONDS, on_wait=on_wait) as pooled:
+        reader = pooled if opts['title_source'] != 'text' else None
+        chunks = process_slides_serial(
+            _iter_input_slides(input_paths, counts), reader, batch_size=OCR_BATCH_SIZE, cache=TITLE_CACHE,
+            title_source=opts['title_source'], known_titles=known_titles, radius_px=profile.border_radius,
+            corner_mode=profile.corner_mode, max_height_px=target_height_px(opts['target_dpi']), ocr_mode=OCR_MODE,
+            langs=langs, image_encoding=IMAGE_ENCODING, png_level=PNG_LEVEL, png_optimize=PNG_OPTIMIZE,
+        )
+        writer = BulkSlideWriter(out, layout, profile) if ASSEMBLY == 'bulk' else None
+        pictures = PictureBytes()
+        for chunk, processed in chunks:
+            for idx, blob, fallback_title in chunk:
+                ocr_title, image_bytes = processed.get(idx, (None, None))
+                pictures.add(blob, image_bytes)
+                ocr_title = workbook_title(workbook, known_titles, idx, ocr_title)
+                title = resolve_title(ocr_title, fallback_title, idx, profile.title_case)
+                if writer:
+                    writer.add(title, image_bytes)
+                else:
+                    add_styled_slide(out, layout, title, image_bytes, profile)
+            done += len(chunk)
+            report('styling', done, total)
+    if pictures.count:
+        print(f"Pictures ({IMAGE_ENCODING}): {pictures.summary()}")
+    if TITLE_CACHE:
+        stats = TITLE_CACHE.stats()
+        print(f"Title cache (since start): {stats['hits']} hits, {stats['misses']} misses")
+    stats = TEMPLATE_CACHE.stats()
+    print(f"Template cache (since start): {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['entries']} templates ({stats['bytes'] / 1e6:.1f} MB)")
+    stats = READERS.stats()
+    print(f"OCR readers (since start): {stats['loads']} loads, {stats['evictions']} evictions, "
+          f"{len(stats['pools'])} language sets")
+
+    return out
+
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'GET':
-        return render_template_string(FORM)
-
-    # Save uploads to temp dir
+        return render_template_string(FORM, profile=STYLE_PROFILE, values=STYLE_PROFILE.as_dict(),
+                                      title_cases=TITLE_CASES, corner_modes=CORNER_MODES,
+                                      ocr_langs=','.join(DEFAULT_LANGS))
+
+    # Synchronous flow (kept for scripts); the UI uses /jobs
+    try:
+        opts = _parse_options(request.form)
+    except ValueError as e:
+        return f'Invalid option: {e}', 400
     with tempfile.TemporaryDirectory() as tmpdir:
-        tmp = Path(tmpdir)
-        tpl_file = request.files.get('template')
-        if not tpl_file:
-            return 'Missing template', 400
-        tpl_path = tmp / secure_filename(tpl_file.filename)
-        tpl_file.save(tpl_path)
-
-        inputs = request.files.getlist('inputs')
-        if not inputs:
-            return 'No inputs', 400
-        input_paths = []
-        for f in inputs:
-            p = tmp / secure_filename(f.filename)
-            f.save(p)
-            input_paths.append(p)
-
-        # Options
-        title_case = request.form.get('title_case', 'smart')
-        title_font_size = int(request.form.get('title_font_size', 28))
-        border_radius = int(request.form.get('border_radius', 10))
-        shadow_enabled = request.form.get('shadow') == 'on'
-        shadow_color_hex = request.form.get('shadow_color', '000000')
-        shadow_transparency = float(request.form.get('shadow_transparency', 0.8))
-        shadow_blur = int(request.form.get('shadow_blur', 15))
-        shadow_angle = int(request.form.get('shadow_angle', 34))
-        shadow_distance = int(request.form.get('shadow_distance', 3))
-        image_left = float(request.form.get('image_left', 2.5))
-        image_top = float(request.form.get('image_top', 1.7))
-
+        tpl_path, input_paths, error = _save_uploads(Path(tmpdir))
+        if error:
+            return error, 400
+        workbook_path = _save_workbook(Path(tmpdir))
+        # Small outputs stay in memory, large ones spill to disk; either way the deck itself is freed before sending
+        buf = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
         try:
-            shadow_color = tuple(int(shadow_color_hex[i:i+2], 16) for i in (0,2,4))
-        except Exception:
-            shadow_color = (0, 0, 0)
-
-        # Build output
-        reader = easyocr.Reader(['en'], gpu=False)
-        out = Presentation(str(tpl_path))
-        tpl = Presentation(str(tpl_path))
-        layout = find_layout(tpl)
-        add_slide_number(out)
-
-        slide_counter = 0
-        for in_path in input_paths:
-            src = Presentation(str(in_path))
-            for s in src.slides:
-                slide_counter += 1
-                slide = out.slides.add_slide(layout)
-
-                # Extract first image
-                image_path = None
-                for shp in s.shapes:
-                    if getattr(shp, 'image', None) is not None:
-                        ext = shp.image.ext or 'png'
-                        tmp_img = tmp / f"_tmp_{slide_counter}.{ext}"
-                        with open(tmp_img, 'wb') as fh:
-                            fh.write(shp.image.blob)
-                        image_path = tmp_img
-                        break
-
-                # Title
-                title = None
-                if image_path and image_path.exists():
-                    title = extract_title_from_image(str(image_path), reader)
-                if not title:
-                    title = guess_title_from_slide(s) or f"Dashboard {slide_counter}"
-                title = (title or '')[:120]
-                title = apply_title_case(title, title_case)
-
-                if slide.shapes.title:
-                    slide.shapes.title.text = title
-                    slide.shapes.title.text_frame.paragraphs[0].runs[0].font.size = Pt(title_font_size)
-                else:
-                    tb = slide.shapes.add_textbox(Inches(0.7), Inches(0.5), out.slide_width - Inches(1.4), Inches(0.6))
-                    p = tb.text_frame.paragraphs[0]
-                    p.text = title
-                    p.runs[0].font.size = Pt(title_font_size)
-
-                # Picture
-                if image_path and image_path.exists():
-                    add_rounded_corners(str(image_path), radius_px=border_radius)
-                    pic = slide.shapes.add_picture(str(image_path), 0, 0)
-                    fit_image_on_blank(slide, out, pic, left_in=image_left, top_in=image_top)
-                    if shadow_enabled:
-                        apply_box_shadow(
-                            pic,
-                            transparency=shadow_transparency,
-                            blur_pt=shadow_blur,
-                            angle_deg=shadow_angle,
-                            distance_pt=shadow_distance,
-                            color=shadow_color,
-                        )
-
-
-        # Save to memory and return
-        buf = io.BytesIO()
-        out.save(buf)
-        buf.seek(0)
-        return send_file(buf, as_attachment=True, download_name='styled_output.pptx', mimetype='application/vnd.openxmlformats-officedocument.presentationml.presentation')
+            with MEMORY_BUDGET.reserve(_job_memory(tpl_path, input_paths, workbook_path), timeout=READER_WAIT_SECONDS):
+                out = build_styled_deck(tpl_path, input_paths, opts, workbook_path=workbook_path)
+                save_presentation(out, buf, ZIP_LEVEL, STORE_MEDIA)
+                del out
+        except JobTooLarge as e:
+            buf.close()
+            return str(e), 413
+        except (ReaderPoolTimeout, MemoryBudgetTimeout):
+            buf.close()
+            return 'Server busy, please retry shortly', 503
+        size = buf.tell()
+
+    return Response(_stream_file(buf), mimetype=PPTX_MIMETYPE, direct_passthrough=True, headers={
+        'Content-Length': str(size),
+        'Content-Disposition': 'attachment; filename=styled_output.pptx',
+    })
+
+
+def _run_job(job, tpl_path, input_paths, opts, workbook_path=None):
+    artifact = job.work_dir / 'styled_output.pptx'
+    # Queue here until the memory budget has room for this job
+    with MEMORY_BUDGET.reserve(_job_memory(tpl_path, input_paths, workbook_path),
+                               on_wait=lambda: job.update('waiting for memory')):
+        out = build_styled_deck(tpl_path, input_paths, opts,
+                                progress=lambda stage, done, total: job.update(stage, done, total),
+                                workbook_path=workbook_path)
+        job.update('saving')
+        save_presentation(out, str(artifact), ZIP_LEVEL, STORE_MEDIA)
+        del out
+    # Inputs are no longer needed once the artifact exists
+    for p in [tpl_path, *input_paths, *([workbook_path] if workbook_path else [])]:
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+    return artifact
+
+
+@app.post('/jobs')
+def submit_job():
+    try:
+        opts = _parse_options(request.form)
+    except ValueError as e:
+        return jsonify(error=f'Invalid option: {e}'), 400
+    try:
+        job = JOBS.new_job()
+    except JobQueueFull:
+        return jsonify(error='Too many jobs queued, please retry shortly'), 429
+    try:
+        tpl_path, input_paths, error = _save_uploads(job.work_dir)
+        if error:
+            JOBS.discard(job)
+            return jsonify(error=error), 400
+        workbook_path = _save_workbook(job.work_dir)
+        needed = _job_memory(tpl_path, input_paths, workbook_path)
+        if MEMORY_BUDGET.limit_bytes > 0 and needed > MEMORY_BUDGET.limit_bytes:
+            JOBS.discard(job)
+            return jsonify(error=f'Job needs about {needed / 1e6:.0f} MB, over the '
+                                 f'{MEMORY_BUDGET.limit_bytes / 1e6:.0f} MB budget'), 413
+        JOBS.submit(job, _run_job, tpl_path, input_paths, opts, workbook_path)
+    except Exception:
+        # Never leave a reserved slot queued forever
+        JOBS.discard(job)
+        raise
+    return jsonify(
+        id=job.id,
+        status_url=f'/jobs/{job.id}',
+        events_url=f'/jobs/{job.id}/events',
+        download_url=f'/jobs/{job.id}/download',
+    ), 202
+
+
+@app.get('/jobs/<job_id>')
+def job_status(job_id):
+    job = JOBS.get(job_id)
+    if not job:
+        return jsonify(error='Unknown or expired job'), 404
+    return jsonify(job.snapshot())
+
+
+@app.get('/jobs/<job_id>/events')
+def job_events(job_id):
+    job = JOBS.get(job_id)
+    if not job:
+        return jsonify(error='Unknown or expired job'), 404
+
+    def stream():
+        last = None
+        while True:
+            snap = job.snapshot()
+            if snap != last:
+                yield f"data: {json.dumps(snap)}\n\n"
+                last = snap
+            if snap['status'] in ('done', 'failed'):
+                return
+            time.sleep(0.5)
+
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.get('/jobs/<job_id>/download')
+def job_download(job_id):
+    job = JOBS.get(job_id)
+    if not job:
+        return jsonify(error='Unknown or expired job'), 404
+    if job.status != 'done' or not job.artifact or not job.artifact.exists():
+        return jsonify(error=f'Job is {job.status}'), 409
+    return send_file(str(job.artifact), as_attachment=True, download_name='styled_output.pptx', mimetype=PPTX_MIMETYPE)
+
+
+@app.get('/metrics')
+def metrics():
+    """
+    Cumulative per-stage histograms and event counters in Prometheus text format.
+    Each process counts on its own, so every series carries this worker's pid.
+    """
+    return Response(METRICS.prometheus(labels={'worker': os.getpid()}), mimetype='text/plain; version=0.0.4')
+
+
+def preload(langs=None, templates=()):
+    """
+    Load OCR weights for langs (default PPTX_OCR_LANGS) and parse templates into
+    TEMPLATE_CACHE. Run in a pre-fork master so workers share these pages copy-on-write.
+    """
+    started = time.perf_counter()
+    try:
+        READERS.pool(langs or DEFAULT_LANGS).warm()
+    except Exception as e:
+        print(f"OCR preload skipped, readers load on first use: {e}")
+    for path in templates:
+        try:
+            TEMPLATE_CACHE.preload(path)
+        except Exception as e:
+            print(f"Template preload failed for {path}: {e}")
+    # Move everything loaded so far out of the collector's reach: its passes would
+    # otherwise write to (and so un-share) these objects' pages in every worker
+    gc.freeze()
+    print(f"Preloaded in {time.perf_counter() - started:.1f}s: readers {READERS.stats()['loads']}, "
+          f"templates {TEMPLATE_CACHE.stats()['entries']}")
+
+
+def create_app(preload_models=None):
+    """
+    The WSGI app for servers that import it, e.g. `gunicorn -c gunicorn.conf.py`.
+    Unless preload_models (default PPTX_PRELOAD, on) is false, preload() runs first
+    with the templates listed in PPTX_PRELOAD_TEMPLATES (separated by os.pathsep).
+    """
+    if preload_models is None:
+        preload_models = os.environ.get('PPTX_PRELOAD', '1') != '0'
+    if preload_models:
+        templates = [t for t in os.environ.get('PPTX_PRELOAD_TEMPLATES', '').split(os.pathsep) if t]
+        preload(templates=templates)
+    return app
+
+
+def after_fork():
+    """
+    Per-process state for a worker forked from a preloaded master: threads and
+    SQLite connections must not cross fork, so the job runner and title cache
+    are restarted. Readers and templates stay shared.
+    """
+    global TITLE_CACHE
+    JOBS.after_fork()
+    if TITLE_CACHE is not None:
+        TITLE_CACHE = TitleCache(default_cache_dir())
 
 
 if __name__ == '__main__':
-    # Run server: FLASK_APP=style_pptx_web.py flask run (or python style_pptx_web.py)
-    app.run(host='127.0.0.1', port=5001, debug=False)
+    # Run server: FLASK_APP=style_pptx_web.py flask run (or python style_pptx_web.py);
+    # several worker processes: gunicorn -c gunicorn.conf.py
+    # Load OCR weights before accepting requests; `flask run` loads them on first use instead.
+    create_app().run(host='127.0.0.1', port=5001, debug=False)
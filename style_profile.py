@@ -0,0 +1,244 @@
+"""
+Brand style profile: title and picture styling compiled once per job.
+
+A profile holds the styling options (title case and size, picture position,
+corners, drop shadow) and turns them into ready-made DrawingML fragments when
+it is created: the title run's a:rPr, the picture's roundRect a:prstGeom and
+its a:outerShdw shadow. Styling a slide then clones those fragments onto the
+title run and picture instead of building the elements from the options again.
+
+Profiles can be kept in a JSON or YAML file (YAML needs PyYAML) using the same
+keys as the CLI options, e.g.
+
+  title_case: smart
+  title_font_size: 28
+  border_radius: 12
+  shadow: true
+  shadow_color: "1F2937"
+  shadow_transparency: 0.75
+
+Keys left out keep their defaults; unknown keys and title_case or corner_mode
+values outside TITLE_CASES / CORNER_MODES are an error.
+
+Usage:
+  profile = StyleProfile.load("brand.yaml")        # or StyleProfile(**options)
+  profile.style_title_run(run)
+  profile.style_picture(pic, width_px, height_px)
+"""
+
+import copy
+import json
+from pathlib import Path
+
+from pptx.oxml.ns import qn
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.util import Pt
+
+PROFILE_DEFAULTS = dict(
+    title_case="smart",
+    title_font_size=28,
+    image_left=2.5,
+    image_top=1.7,
+    corner_mode="vector",
+    border_radius=10,
+    shadow=True,
+    shadow_color="000000",
+    shadow_transparency=0.8,
+    shadow_blur=15,
+    shadow_angle=34,
+    shadow_distance=3,
+)
+TITLE_CASES = ("smart", "camel", "upper", "lower")
+CORNER_MODES = ("vector", "raster")
+_CHOICES = {"title_case": TITLE_CASES, "corner_mode": CORNER_MODES}
+
+
+def check_choices(values: dict):
+    """Raise ValueError when title_case or corner_mode in values is not one of the allowed values."""
+    for key, allowed in _CHOICES.items():
+        if key in values and values[key] not in allowed:
+            raise ValueError(f"{key} must be one of {', '.join(allowed)}, not {values[key]!r}")
+
+
+def load_profile_file(path) -> dict:
+    """Profile options from a .json, .yaml or .yml file, checked against PROFILE_DEFAULTS."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"{path.name}: YAML profiles need PyYAML (pip install pyyaml), or use JSON")
+        try:
+            values = yaml.safe_load(text) or {}
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path.name}: {e}")
+    else:
+        values = json.loads(text)
+    if not isinstance(values, dict):
+        raise ValueError(f"{path.name}: a style profile must be a mapping of option names to values")
+    unknown = sorted(set(values) - set(PROFILE_DEFAULTS))
+    if unknown:
+        raise ValueError(f"{path.name}: unknown style profile keys: {', '.join(unknown)}")
+    try:
+        check_choices(values)
+    except ValueError as e:
+        raise ValueError(f"{path.name}: {e}")
+    return values
+
+
+def parse_hex_color(value, default=(0, 0, 0)):
+    """(r, g, b) from "RRGGBB" (a leading # is allowed), or default when it does not parse."""
+    try:
+        value = str(value).lstrip("#")
+        return tuple(int(value[i:i+2], 16) for i in (0, 2, 4))
+    except Exception:
+        return default
+
+
+def _title_rPr(font_size):
+    rPr = OxmlElement("a:rPr")
+    rPr.set("sz", str(int(Pt(font_size).centipoints)))
+    return rPr
+
+
+def outer_shadow(transparency, blur_pt, angle_deg, distance_pt, color):
+    """
+    a:outerShdw for a picture: blur/distance in EMUs, direction in 1/60000 deg,
+    colour with alpha (alpha is opacity; transparency 0.8 => alpha 0.2).
+    """
+    outer = OxmlElement("a:outerShdw")
+    outer.set("blurRad", str(int(Pt(blur_pt))))
+    outer.set("dist", str(int(Pt(distance_pt))))
+    outer.set("dir", str(int(angle_deg * 60000)))
+    outer.set("algn", "ctr")
+    srgb = OxmlElement("a:srgbClr")
+    srgb.set("val", "%02X%02X%02X" % tuple(color))
+    alpha = OxmlElement("a:alpha")
+    alpha.set("val", str(int((1.0 - float(transparency)) * 100000)))
+    srgb.append(alpha)
+    outer.append(srgb)
+    return outer
+
+
+def round_rect_geom(adj: int = 0):
+    """a:prstGeom prst="roundRect" with the given adj (see corner_adj)."""
+    geom = OxmlElement("a:prstGeom")
+    geom.set("prst", "roundRect")
+    av = OxmlElement("a:avLst")
+    gd = OxmlElement("a:gd")
+    gd.set("name", "adj")
+    gd.set("fmla", f"val {int(adj)}")
+    av.append(gd)
+    geom.append(av)
+    return geom
+
+
+def picture_spPr(pic):
+    """p:spPr of a p:pic (or python-pptx Picture), created when missing."""
+    pic = getattr(pic, "_element", pic)
+    spPr = pic.find(qn("p:spPr"))
+    if spPr is None:
+        spPr = OxmlElement("p:spPr")
+        pic.append(spPr)
+    return spPr
+
+
+def set_geometry(spPr, geom):
+    """Put geom in spPr, replacing any existing geometry in place (schema order: xfrm, geometry, fill, ln, effectLst...)."""
+    existing = spPr.find(qn("a:prstGeom"))
+    if existing is None:
+        existing = spPr.find(qn("a:custGeom"))
+    if existing is not None:
+        existing.addprevious(geom)
+        spPr.remove(existing)
+    else:
+        xfrm = spPr.find(qn("a:xfrm"))
+        if xfrm is not None:
+            xfrm.addnext(geom)
+        else:
+            spPr.insert(0, geom)
+
+
+def set_shadow(spPr, outer):
+    """Put the a:outerShdw outer in spPr's a:effectLst (created when missing), replacing any previous one."""
+    effect_lst = spPr.find(qn("a:effectLst"))
+    if effect_lst is None:
+        effect_lst = OxmlElement("a:effectLst")
+        spPr.append(effect_lst)
+    for child in list(effect_lst):
+        if child.tag == qn("a:outerShdw"):
+            effect_lst.remove(child)
+    effect_lst.append(outer)
+
+
+def corner_adj(radius_px, width_px, height_px) -> int:
+    """roundRect adj (1/100000 of the shorter side) for a radius_px corner on a width x height image."""
+    return max(0, min(50000, int(round(100000.0 * radius_px / max(1, min(width_px, height_px))))))
+
+
+class StyleProfile:
+    """
+    Styling options with their precompiled XML fragments.
+    Attributes mirror PROFILE_DEFAULTS; treat an instance as read-only.
+    """
+
+    def __init__(self, **options):
+        unknown = sorted(set(options) - set(PROFILE_DEFAULTS))
+        if unknown:
+            raise TypeError(f"unknown style profile options: {', '.join(unknown)}")
+        values = dict(PROFILE_DEFAULTS, **options)
+        check_choices(values)
+        values["shadow_color"] = "%02X%02X%02X" % parse_hex_color(values["shadow_color"])
+        self.title_case = values["title_case"]
+        self.title_font_size = int(values["title_font_size"])
+        self.image_left = float(values["image_left"])
+        self.image_top = float(values["image_top"])
+        self.corner_mode = values["corner_mode"]
+        self.border_radius = int(values["border_radius"])
+        self.shadow = None
+        if values["shadow"]:
+            self.shadow = dict(
+                transparency=float(values["shadow_transparency"]),
+                blur_pt=values["shadow_blur"],
+                angle_deg=values["shadow_angle"],
+                distance_pt=values["shadow_distance"],
+                color=parse_hex_color(values["shadow_color"]),
+            )
+        self._values = values
+
+        # Fragments cloned onto every slide
+        self._title_rPr = _title_rPr(self.title_font_size)
+        self._outer_shdw = outer_shadow(**self.shadow) if self.shadow else None
+        self._geom = round_rect_geom() if self.corner_mode == "vector" and self.border_radius > 0 else None
+
+    @classmethod
+    def load(cls, path, **overrides) -> "StyleProfile":
+        """Profile from a JSON/YAML file, with keyword overrides on top."""
+        return cls(**dict(load_profile_file(path), **overrides))
+
+    @classmethod
+    def from_options(cls, options) -> "StyleProfile":
+        """Profile from any object with PROFILE_DEFAULTS-named attributes (e.g. parsed CLI args)."""
+        return cls(**{k: getattr(options, k) for k in PROFILE_DEFAULTS if hasattr(options, k)})
+
+    def as_dict(self) -> dict:
+        return dict(self._values)
+
+    def style_title_run(self, run):
+        """Give an a:r (or python-pptx _Run) the profile's run properties."""
+        r = getattr(run, "_r", run)
+        existing = r.find(qn("a:rPr"))
+        if existing is not None:
+            r.remove(existing)
+        r.insert(0, copy.deepcopy(self._title_rPr))
+
+    def style_picture(self, pic, width_px, height_px):
+        """Rounded-corner geometry and shadow on a p:pic (or python-pptx Picture) of a width x height image."""
+        spPr = picture_spPr(pic)
+        if self._geom is not None:
+            geom = copy.deepcopy(self._geom)
+            geom[0][0].set("fmla", f"val {corner_adj(self.border_radius, width_px, height_px)}")
+            set_geometry(spPr, geom)
+        if self._outer_shdw is not None:
+            set_shadow(spPr, copy.deepcopy(self._outer_shdw))
@@ -9,63 +9,157 @@ Usage:
   python style_tableau_pptx.py --input tableau_export.pptx --template brand_template.pptx --output styled.pptx \
       --logo /path/logo.png --title-case smart --fit contain --max-margin 32 --footer "The Navigators — Confidential"
       
-Note: First run will download OCR language models (~100MB).
+Note: First run will download OCR language models (~100MB). easyocr (and torch)
+is only imported once a slide actually needs OCR; `--title-source text` never imports it.
 """
 
 import argparse
-from pptx import Presentation
+import copy
+import glob
+import io
+import json
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
-from pptx.oxml.xmlchemy import OxmlElement
 from pptx.oxml.ns import qn
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.image import Image as PptxImage, ImagePart
+from pptx.parts.slide import SlidePart
 from PIL import Image, ImageDraw
-import os
 from typing import Optional
-import easyocr
 import numpy as np
+from title_cache import TitleCache, default_cache_dir
+from source_reader import count_source_slides, iter_source_slides, picture_slide_indices
+from workbook_titles import WorkbookTitles
+from incremental import IncrementalRun, file_digest
+from batch import expand_inputs, read_job_list, run_batch, watch_folder
+from metrics import METRICS
+from ocr_readers import ReaderUnavailable, normalize_langs
+from template_cache import TemplateCache
+from pptx_writer import DEFAULT_ZIP_LEVEL, save_pptx
+from image_encoding import DEFAULT_PNG_LEVEL, IMAGE_ENCODINGS, encode_picture
+from style_profile import (CORNER_MODES, TITLE_CASES, StyleProfile, corner_adj, load_profile_file, outer_shadow,
+                           picture_spPr, round_rect_geom, set_geometry, set_shadow)
+
+# easyocr hits at or below this confidence are ignored
+OCR_MIN_CONF = 0.3
+
+# How title strips are OCR'd: "full" runs easyocr's text detector and recognizer;
+# "fast" finds the title line from a projection profile and runs only the recognizer,
+# falling back to full OCR when nothing is read above OCR_MIN_CONF
+OCR_MODES = ("full", "fast")
+
+# Where slide titles come from: OCR of the image (falling back to slide text),
+# slide text only (never loads OCR), or slide text with OCR only for slides without any
+TITLE_SOURCES = ("ocr", "text", "auto")
+
+class LazyReader:
+    """
+    Stand-in for easyocr.Reader that imports easyocr and loads the model on
+    first use, so runs that never OCR a slide skip the multi-second torch import.
+    A failed load is remembered and raised as ReaderUnavailable on every later
+    use, so the run fails instead of retrying the import for each crop.
+    """
+
+    def __init__(self, langs=("en",), verbose=True):
+        self.langs = list(langs)
+        self.verbose = verbose
+        self._reader = None
+        self._error = None
+
+    @property
+    def loaded(self):
+        return self._reader is not None
+
+    def _load(self):
+        if self._reader is None:
+            if self._error is not None:
+                raise self._error
+            if self.verbose:
+                print("Initializing OCR reader (first run may download language models)...")
+            try:
+                with METRICS.stage("ocr_model_load"):
+                    import easyocr
+                    self._reader = easyocr.Reader(self.langs, gpu=False)
+            except Exception as e:
+                self._error = ReaderUnavailable(f"could not load the OCR reader ({e}); "
+                                                f"use --title-source text to style without OCR")
+                raise self._error from e
+            if self.verbose:
+                print("OCR reader ready.")
+        return self._reader
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+def ocr_wanted(chunk, title_source="ocr", known_titles=None):
+    """Indices of (idx, blob, fallback_title) items whose title should be OCR'd."""
+    known = known_titles or {}
+    if title_source == "text":
+        return set()
+    if title_source == "auto":
+        return {idx for idx, blob, fallback in chunk if blob is not None and not fallback and idx not in known}
+    return {idx for idx, blob, _ in chunk if blob is not None and idx not in known}
+
+def match_workbook_titles(workbook, deck, mode="auto", start=1):
+    """
+    {slide idx: title} for the deck's picture slides paired with the workbook's
+    sheets by position. mode "fuzzy" skips positional matching (titles then come
+    from OCR snapped to the workbook); "order" warns when the counts differ.
+    """
+    if workbook is None or mode == "fuzzy":
+        return {}
+    pictures = picture_slide_indices(deck, start=start)
+    known = workbook.match_order(pictures)
+    if not known and mode == "order":
+        print(f"Warning: {deck} has {len(pictures)} picture slides but the workbook has {len(workbook)} sheets; "
+              f"matching OCR text instead")
+    return known
+
+def workbook_title(workbook, known_titles, idx, ocr_title):
+    """The slide's workbook title when matched by position, else the OCR title snapped to the closest workbook title."""
+    if idx in known_titles:
+        METRICS.count("title_from_workbook")
+        return known_titles[idx]
+    if workbook is not None and ocr_title:
+        return workbook.snap(ocr_title)
+    return ocr_title
 
 def _apply_box_shadow_xml(picture_shape, transparency=0.8, blur_pt=15, angle_deg=34, distance_pt=3, color=(0, 0, 0)):
     """
-    DrawingML fallback: inject a:outerShdw into p:spPr/a:effectLst for a picture.
-    Uses EMUs for blur/distance and 1/60000 deg for direction per spec.
+    DrawingML fallback: inject a:outerShdw into p:spPr/a:effectLst for a picture
+    (the same fragment StyleProfile clones onto each slide).
     """
     try:
-        pic_elm = picture_shape._element  # CT_Picture
-        # Ensure there is a p:spPr element
-        spPr = pic_elm.find(qn('p:spPr'))
-        if spPr is None:
-            spPr = OxmlElement('p:spPr')
-            pic_elm.append(spPr)
-        # Ensure there is an a:effectLst
-        effectLst = spPr.find(qn('a:effectLst'))
-        if effectLst is None:
-            effectLst = OxmlElement('a:effectLst')
-            spPr.append(effectLst)
-        # Remove existing outerShdw to avoid duplicates
-        for child in list(effectLst):
-            if child.tag == qn('a:outerShdw'):
-                effectLst.remove(child)
-
-        outer = OxmlElement('a:outerShdw')
-        outer.set('blurRad', str(int(Pt(blur_pt))))
-        outer.set('dist', str(int(Pt(distance_pt))))
-        outer.set('dir', str(int(angle_deg * 60000)))
-        outer.set('algn', 'ctr')
-        # Color with alpha (alpha is opacity; transparency 0.8 => alpha 0.2)
-        rgb_hex = f"{color[0]:02X}{color[1]:02X}{color[2]:02X}"
-        srgb = OxmlElement('a:srgbClr')
-        srgb.set('val', rgb_hex)
-        alpha = OxmlElement('a:alpha')
-        alpha.set('val', str(int((1.0 - float(transparency)) * 100000)))
-        srgb.append(alpha)
-        outer.append(srgb)
-        effectLst.append(outer)
+        set_shadow(picture_spPr(picture_shape), outer_shadow(transparency, blur_pt, angle_deg, distance_pt, color))
         return True
     except Exception as e:
         print(f"Warning: XML shadow fallback failed: {e}")
         return False
 
+def apply_rounded_corners_xml(picture_shape, radius_px=10):
+    """
+    Vector rounded corners: switch the picture's p:spPr preset geometry to
+    a:prstGeom prst="roundRect" so PowerPoint clips the untouched image itself
+    (see corner_adj for how radius_px maps to the roundRect adj value).
+    """
+    try:
+        width_px, height_px = picture_shape.image.size
+        set_geometry(picture_spPr(picture_shape), round_rect_geom(corner_adj(radius_px, width_px, height_px)))
+        return True
+    except Exception as e:
+        print(f"Warning: vector rounded corners failed: {e}")
+        return False
+
 def apply_box_shadow(shape, transparency=0.8, blur_pt=15, angle_deg=34, distance_pt=3, color=(0, 0, 0)):
     """
     Apply a drop shadow to a shape (picture) using PowerPoint's native shadow.
@@ -99,26 +193,32 @@ def apply_box_shadow(shape, transparency=0.8, blur_pt=15, angle_deg=34, distance
         print(f"Warning: could not apply shadow via API: {e}")
         _apply_box_shadow_xml(shape, transparency, blur_pt, angle_deg, distance_pt, color)
 
-def add_rounded_corners(image_path, radius_px=5):
+def round_image_corners(img, radius_px=5):
+    """
+    Return an RGBA copy of a PIL image with transparent rounded corners.
+    """
+    output = img.convert("RGBA")
+
+    # Create a mask for rounded corners
+    mask = Image.new('L', img.size, 0)
+    draw = ImageDraw.Draw(mask)
+    draw.rounded_rectangle([(0, 0), img.size], radius=radius_px, fill=255)
+
+    # Apply the mask
+    output.putalpha(mask)
+    return output
+
+def add_rounded_corners(image_path, radius_px=5, encoding="truecolor", png_level=DEFAULT_PNG_LEVEL, png_optimize=False):
     """
-    Add rounded corners to an image and save it.
+    Add rounded corners to an image and save it as PNG (see image_encoding for encoding).
     Modifies the image file in place.
     """
     try:
-        img = Image.open(image_path).convert("RGBA")
-        
-        # Create a mask for rounded corners
-        mask = Image.new('L', img.size, 0)
-        draw = ImageDraw.Draw(mask)
-        draw.rounded_rectangle([(0, 0), img.size], radius=radius_px, fill=255)
-        
-        # Apply the mask
-        output = Image.new('RGBA', img.size)
-        output.paste(img, (0, 0))
-        output.putalpha(mask)
+        with Image.open(image_path) as img:
+            output = round_image_corners(img, radius_px)
         
         # Save back to the same path
-        output.save(image_path, 'PNG')
+        Path(image_path).write_bytes(encode_picture(output, encoding, png_level, png_optimize))
     except Exception as e:
         print(f"Failed to add rounded corners: {e}")
 
@@ -176,37 +276,248 @@ def guess_title_from_slide(slide) -> Optional[str]:
                 return txt.splitlines()[0][:120]
     return None
 
-def extract_title_from_image(image_path, reader) -> Optional[str]:
+def _title_crop(img):
+    """
+    Crop to the top-left corner where Tableau titles typically are:
+    left 40% of width, top 5% of height.
+    """
+    width, height = img.size
+    return img.crop((0, 0, int(width * 0.4), int(height * 0.05)))
+
+# Title-strip ink pre-screen (pass ink_screen=None to disable): pixels whose gray
+# level differs from the strip's background by more than min_contrast count as
+# ink; strips with less than min_ink_ratio ink are blank and skip OCR entirely
+INK_SCREEN = dict(min_contrast=40, min_ink_ratio=0.002, pad_px=4)
+
+def _ink_mask(gray, min_contrast):
+    """Boolean mask of pixels whose gray level differs from the strip background by more than min_contrast."""
+    # Background is the most common gray level; Tableau title strips are flat fills
+    background = np.bincount(gray.ravel(), minlength=256).argmax()
+    return np.abs(gray.astype(np.int16) - background) > min_contrast
+
+def title_line_box(gray, min_contrast=40, gap_px=2, pad_px=2):
+    """
+    (x_min, x_max, y_min, y_max) of the title line in a grayscale strip, from
+    row and column projection profiles of its ink: rows with ink form bands
+    (bridging gaps of up to gap_px rows), the band with the most ink is the
+    title line. None when the strip has no ink.
+    """
+    if gray.size == 0:
+        return None
+    ink = _ink_mask(gray, min_contrast)
+    rows = ink.sum(axis=1)
+    inked = np.flatnonzero(rows)
+    if inked.size == 0:
+        return None
+    # Split inked rows into bands wherever more than gap_px blank rows separate them
+    splits = np.flatnonzero(np.diff(inked) > gap_px + 1) + 1
+    bands = np.split(inked, splits)
+    band = max(bands, key=lambda b: rows[b].sum())
+    y_min, y_max = int(band[0]), int(band[-1]) + 1
+    cols = np.flatnonzero(ink[y_min:y_max].any(axis=0))
+    height, width = gray.shape
+    return (max(0, int(cols[0]) - pad_px), min(width, int(cols[-1]) + 1 + pad_px),
+            max(0, y_min - pad_px), min(height, y_max + pad_px))
+
+def title_ink_box(crop, min_contrast=40, min_ink_ratio=0.002, pad_px=4):
+    """
+    Vectorized blank check for a title strip. Returns the (left, top, right,
+    bottom) box around its ink, padded by pad_px, or None when the strip is
+    blank. Boxes keep the full strip height and round the width up to 32 px
+    so trimmed strips from one export still share a size for batched OCR.
+    """
+    gray = np.asarray(crop.convert("L"), dtype=np.int16)
+    if gray.size == 0:
+        return None
+    ink = _ink_mask(gray, min_contrast)
+    if ink.mean() < min_ink_ratio:
+        return None
+    cols = np.flatnonzero(ink.any(axis=0))
+    height, width = gray.shape
+    left = max(0, int(cols[0]) - pad_px)
+    right = min(width, int(cols[-1]) + 1 + pad_px)
+    right = min(width, left + -(-(right - left) // 32) * 32)
+    return left, 0, right, height
+
+def _screen_title_crop(crop, ink_screen):
+    """(found ink, crop trimmed to it) under ink_screen settings; None settings keep the crop as-is."""
+    if ink_screen is None:
+        return True, crop
+    with METRICS.stage("ink_screen"):
+        box = title_ink_box(crop, **ink_screen)
+    if box is None:
+        METRICS.count("ocr_skipped_blank")
+        return False, None
+    if box != (0, 0) + crop.size:
+        crop = crop.crop(box)
+    return True, crop
+
+def _title_from_ocr_result(result, min_conf=OCR_MIN_CONF) -> Optional[str]:
+    """Join easyocr (bbox, text, confidence) hits above min_conf, top to bottom."""
+    if result:
+        texts = [text for (bbox, text, conf) in result if conf > min_conf]
+        if texts:
+            # Join all text pieces (in case title is split)
+            # Sort by vertical position (top to bottom)
+            sorted_results = sorted(result, key=lambda x: x[0][0][1])  # sort by y-coordinate
+            title = " ".join([text for (bbox, text, conf) in sorted_results if conf > min_conf])
+            return title.strip()[:120] if title.strip() else None
+    return None
+
+def recognize_title_line(crop, reader, min_contrast=INK_SCREEN["min_contrast"]) -> Optional[str]:
+    """
+    Fast path: run only easyocr's recognizer on the title line found by
+    title_line_box, skipping text detection. None when the strip has no line
+    or nothing was read above OCR_MIN_CONF, so the caller can fall back to readtext.
+    """
+    gray = np.asarray(crop.convert("L"))
+    box = title_line_box(gray, min_contrast)
+    if box is None:
+        return None
+    with METRICS.stage("ocr_recognize", bytes_in=gray.nbytes):
+        result = reader.recognize(gray, horizontal_list=[list(box)], free_list=[])
+    return _title_from_ocr_result(result)
+
+def _fast_title(crop, reader, ink_screen) -> Optional[str]:
+    """recognize_title_line, counted as ocr_fast_path or ocr_fast_fallback; errors count as fallbacks."""
+    min_contrast = (ink_screen or INK_SCREEN)["min_contrast"]
+    try:
+        title = recognize_title_line(crop, reader, min_contrast)
+    except ReaderUnavailable:
+        raise
+    except Exception as e:
+        print(f"Recognition-only OCR failed, using full OCR: {e}")
+        title = None
+    METRICS.count("ocr_fast_path" if title else "ocr_fast_fallback")
+    return title
+
+def extract_title_from_image(image, reader, ink_screen=INK_SCREEN, ocr_mode="full") -> Optional[str]:
     """
     Use OCR to extract the title from the top-left corner of an image.
-    Assumes the title is in the top-left 40% width x 15% height area.
+    Assumes the title is in the top-left 40% width x 5% height area.
+    `image` may be a path or an already-decoded PIL image. Blank strips
+    (see title_ink_box) return None without running OCR. ocr_mode "fast"
+    tries recognize_title_line before full OCR.
     """
     try:
-        with Image.open(image_path) as img:
-            width, height = img.size
-            # Crop to top-left corner where Tableau titles typically are
-            # Left 40% of width, top 15% of height
-            top_left = img.crop((0, 0, int(width * 0.4), int(height * 0.05)))
-            
-            # Convert PIL Image to numpy array for easyocr
-            img_array = np.array(top_left)
-            
-            # Run OCR on the cropped portion (without paragraph mode)
+        if isinstance(image, Image.Image):
+            crop = _title_crop(image)
+        else:
+            with Image.open(image) as img:
+                crop = _title_crop(img)
+        has_ink, crop = _screen_title_crop(crop, ink_screen)
+        if not has_ink:
+            return None
+        if ocr_mode == "fast":
+            title = _fast_title(crop, reader, ink_screen)
+            if title:
+                return title
+        # Convert PIL Image to numpy array for easyocr
+        img_array = np.array(crop)
+        
+        # Run OCR on the cropped portion (without paragraph mode)
+        with METRICS.stage("ocr", bytes_in=img_array.nbytes):
             result = reader.readtext(img_array)
-            
-            if result:
-                # easyocr returns list of (bbox, text, confidence)
-                texts = [text for (bbox, text, conf) in result if conf > 0.3]
-                if texts:
-                    # Join all text pieces (in case title is split)
-                    # Sort by vertical position (top to bottom)
-                    sorted_results = sorted(result, key=lambda x: x[0][0][1])  # sort by y-coordinate
-                    title = " ".join([text for (bbox, text, conf) in sorted_results if conf > 0.3])
-                    return title.strip()[:120] if title.strip() else None
+        return _title_from_ocr_result(result)
+    except ReaderUnavailable:
+        raise
     except Exception as e:
         print(f"OCR failed: {e}")
     return None
 
+def _readtext_or_none(reader, arr):
+    """
+    reader.readtext(arr), or None (no title) when OCR of this one crop fails.
+    ReaderUnavailable (no reader free in time, or none could be loaded) is raised,
+    not turned into a blank title.
+    """
+    try:
+        return reader.readtext(arr)
+    except ReaderUnavailable:
+        raise
+    except Exception as e:
+        print(f"OCR failed: {e}")
+        return None
+
+
+def ocr_title_crops(crops, reader, batch_size=8, cache=None, langs=("en",), ink_screen=INK_SCREEN, ocr_mode="full"):
+    """
+    Run already-cropped title strips through easyocr's readtext_batched in
+    chunks of batch_size. Crops are grouped by size since a batch must share
+    dimensions; None entries are skipped. Returns titles in input order.
+    Blank strips are skipped and the rest trimmed to their ink by the
+    ink_screen pre-screen (None disables it).
+    With a TitleCache, crops seen before are answered from the cache and only
+    the misses are OCR'd (and stored). With ocr_mode "fast" each crop first
+    goes through recognize_title_line; only crops it cannot read are batched
+    for full OCR.
+    """
+    titles = [None] * len(crops)
+    keys = {}
+    by_size = {}
+    for i, crop in enumerate(crops):
+        if crop is None:
+            continue
+        has_ink, trimmed = _screen_title_crop(crop, ink_screen)
+        if not has_ink:
+            continue
+        if cache is not None:
+            key = TitleCache.key(crop, langs, OCR_MIN_CONF, ocr_mode)
+            found, title = cache.get(key)
+            if found:
+                titles[i] = title
+                continue
+            keys[i] = key
+        crop = trimmed
+        if ocr_mode == "fast":
+            title = _fast_title(crop, reader, ink_screen)
+            if title:
+                titles[i] = title
+                if i in keys:
+                    cache.put(keys[i], title)
+                continue
+        arr = np.array(crop.convert("RGB"))
+        by_size.setdefault(arr.shape, []).append((i, arr))
+    batch_size = max(1, int(batch_size))
+    for group in by_size.values():
+        for start in range(0, len(group), batch_size):
+            chunk = group[start:start + batch_size]
+            METRICS.count("ocr_crops", len(chunk))
+            with METRICS.stage("ocr", bytes_in=sum(arr.nbytes for _, arr in chunk)):
+                try:
+                    results = reader.readtext_batched([arr for _, arr in chunk], batch_size=batch_size)
+                except ReaderUnavailable:
+                    raise
+                except Exception as e:
+                    print(f"Batched OCR failed, falling back to per-image OCR: {e}")
+                    METRICS.count("ocr_batch_failures")
+                    results = [_readtext_or_none(reader, arr) for _, arr in chunk]
+            for (i, _), result in zip(chunk, results):
+                titles[i] = _title_from_ocr_result(result)
+                # A crop whose OCR failed is not cached, so a later run retries it
+                if i in keys and result is not None:
+                    cache.put(keys[i], titles[i])
+    return titles
+
+def extract_titles_batched(images, reader, batch_size=8, ink_screen=INK_SCREEN, ocr_mode="full"):
+    """
+    Batched variant of extract_title_from_image for a whole deck (or several).
+    `images` are paths or PIL images; only the small title crops are kept in
+    memory while the batch is assembled. Returns titles in input order.
+    """
+    crops = []
+    for image in images:
+        try:
+            if isinstance(image, Image.Image):
+                crops.append(_title_crop(image))
+            else:
+                with Image.open(image) as img:
+                    crops.append(_title_crop(img))
+        except Exception as e:
+            print(f"OCR failed: {e}")
+            crops.append(None)
+    return ocr_title_crops(crops, reader, batch_size=batch_size, ink_screen=ink_screen, ocr_mode=ocr_mode)
+
 def find_layout(tpl, preferred=("Title Only","Title and Content","Blank")):
     name_to_layout = {l.name: l for l in tpl.slide_layouts}
     for name in preferred:
@@ -224,7 +535,10 @@ def add_slide_number(prs):
     except Exception:
         pass
 
-def fit_image_on_blank(slide, prs, pic, left_in=2.5, top_in=1.7, height_in=4.9):
+# Height every dashboard picture is placed at (see fit_image_on_blank)
+IMAGE_HEIGHT_IN = 4.9
+
+def fit_image_on_blank(slide, prs, pic, left_in=2.5, top_in=1.7, height_in=IMAGE_HEIGHT_IN):
     """
     Reposition + scale the picture and place at provided left/top (inches).
     Sets height to height_in while preserving aspect ratio.
@@ -242,17 +556,514 @@ def fit_image_on_blank(slide, prs, pic, left_in=2.5, top_in=1.7, height_in=4.9):
     shp.left = Inches(left_in)
     shp.top = Inches(top_in)
 
+def collect_source_slides(src, start=1):
+    """
+    Return one (idx, blob, fallback_title) tuple per slide of an already-parsed
+    Presentation; blob is None for slides without a picture. The CLI and web
+    app use the lazy source_reader.iter_source_slides instead.
+    """
+    items = []
+    for idx, s in enumerate(src.slides, start=start):
+        blob = None
+        for shp in s.shapes:
+            if getattr(shp, "image", None) is not None:
+                blob = shp.image.blob
+                break
+        items.append((idx, blob, guess_title_from_slide(s)))
+    return items
+
+def iter_chunks(iterable, size):
+    """Yield lists of up to size items, consuming iterable lazily."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def target_height_px(target_dpi, height_in=IMAGE_HEIGHT_IN):
+    """Pixel height a placed picture needs for target_dpi, or None when resampling is off."""
+    if not target_dpi or target_dpi <= 0:
+        return None
+    return max(1, int(round(height_in * target_dpi)))
+
+def downsample_to_height(img, max_height_px):
+    """Resample img so it is at most max_height_px tall (never upscales)."""
+    if not max_height_px or img.height <= max_height_px:
+        return img
+    width = max(1, int(round(img.width * max_height_px / img.height)))
+    return img.resize((width, max_height_px), Image.LANCZOS)
+
+def process_slide_images(jobs, reader, radius_px=10, batch_size=8, cache=None, corner_mode="vector",
+                         max_height_px=None, ocr_indices=None, ink_screen=INK_SCREEN, ocr_mode="full",
+                         langs=("en",), image_encoding="truecolor", png_level=DEFAULT_PNG_LEVEL, png_optimize=False):
+    """
+    Decode each slide image once, keep its title crop for batched OCR and
+    round its corners from the same decoded image, encoding the result once
+    in memory (image_encoding, png_level and png_optimize as for
+    image_encoding.encode_picture). With corner_mode="vector" the original bytes
+    are kept as-is (corners come from the StyleProfile roundRect geometry once placed)
+    unless max_height_px forces a resample or the encoding re-encodes them
+    (palette: PNG sources; smallest: any source, kept if still the smallest).
+    The title crop is always taken from the
+    full-resolution image so OCR accuracy is unaffected by downsampling.
+    Only slides in ocr_indices (default: all) are OCR'd; reader is not touched
+    when none are; langs (the reader's languages) is part of the title-cache key.
+    jobs: list of (idx, blob). Returns {idx: (title or None, image bytes)}.
+    """
+    crops, encoded = [], []
+    for idx, blob in jobs:
+        crop, data = None, blob
+        try:
+            with Image.open(io.BytesIO(blob)) as img:
+                with METRICS.stage("image_decode", bytes_in=len(blob)):
+                    img.load()
+                if ocr_indices is None or idx in ocr_indices:
+                    crop = _title_crop(img)
+                fmt = img.format
+                with METRICS.stage("resample"):
+                    out_img = downsample_to_height(img, max_height_px)
+                resized = out_img is not img
+                if corner_mode == "raster":
+                    with METRICS.stage("round_corners"):
+                        out_img = round_image_corners(out_img, radius_px)
+                changed = corner_mode == "raster" or resized
+                reencode = image_encoding == "smallest" or (image_encoding == "palette" and fmt == "PNG")
+                if changed or reencode:
+                    with METRICS.stage("image_encode") as st:
+                        data = encode_picture(out_img, image_encoding, png_level, png_optimize,
+                                              original=None if changed else blob,
+                                              jpeg=corner_mode != "raster" and fmt == "JPEG")
+                        st.bytes_out = len(data)
+        except Exception as e:
+            print(f"Failed to process image {idx}: {e}")
+        crops.append(crop)
+        encoded.append(data)
+    titles = ocr_title_crops(crops, reader, batch_size=batch_size, cache=cache, langs=langs, ink_screen=ink_screen,
+                             ocr_mode=ocr_mode)
+    return {idx: (title, data) for (idx, _), title, data in zip(jobs, titles, encoded)}
+
+def process_slides_serial(items, reader, batch_size=8, cache=None, title_source="ocr", known_titles=None,
+                          **options):
+    """
+    Pull (idx, blob, fallback_title) items lazily and yield
+    (chunk, {idx: (title, image bytes)}) one OCR batch at a time, so only one
+    batch of source images is held in memory. title_source and known_titles
+    (slides already titled from a workbook) pick which slides are OCR'd (see
+    ocr_wanted); reader may be None when no slide needs OCR.
+    """
+    for chunk in iter_chunks(items, max(1, int(batch_size))):
+        jobs = [(idx, blob) for idx, blob, _ in chunk if blob is not None]
+        yield chunk, process_slide_images(jobs, reader, batch_size=batch_size, cache=cache,
+                                          ocr_indices=ocr_wanted(chunk, title_source, known_titles), **options)
+
+# One OCR model (and title cache connection) per worker process, set up by the pool initializer
+_WORKER_READER = None
+_WORKER_CACHE = None
+
+def _init_ocr_worker(langs, cache_dir=None, profile=False):
+    global _WORKER_READER, _WORKER_CACHE
+    METRICS.enabled = profile
+    # Loaded on the worker's first OCR call, so text-only runs never import easyocr
+    _WORKER_READER = LazyReader(langs, verbose=False)
+    _WORKER_CACHE = TitleCache(cache_dir) if cache_dir else None
+
+def _process_chunk_in_worker(chunk):
+    jobs, options = chunk
+    before = _WORKER_CACHE.stats() if _WORKER_CACHE else {"hits": 0, "misses": 0}
+    results = process_slide_images(jobs, _WORKER_READER, cache=_WORKER_CACHE, **options)
+    after = _WORKER_CACHE.stats() if _WORKER_CACHE else before
+    # Hand this worker's metrics since the last chunk back to the parent
+    metrics = METRICS.snapshot() if METRICS.enabled else None
+    METRICS.reset()
+    return results, {k: after[k] - before[k] for k in before}, metrics
+
+def ocr_worker_pool(workers, langs=("en",), cache_dir=None):
+    """Process pool whose workers each hold one (lazily loaded) OCR reader and title-cache connection."""
+    initargs = (tuple(langs), str(cache_dir) if cache_dir else None, METRICS.enabled)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker, initargs=initargs)
+
+def process_slides_parallel(items, workers, batch_size=8, langs=("en",), cache_dir=None, cache_stats=None,
+                            title_source="ocr", known_titles=None, pool=None, **options):
+    """
+    Fan OCR + corner rounding out to a process pool, one OCR batch per task.
+    Items are pulled lazily with at most 2 * workers batches in flight and
+    (chunk, {idx: (title, image bytes)}) pairs are yielded in source order.
+    Extra keyword options are passed through to process_slide_images; the
+    workers' title-cache hits/misses are added into cache_stats if given, and
+    their stage metrics are merged into METRICS when it is enabled.
+    Pass an ocr_worker_pool() as pool to reuse warm workers across decks.
+    """
+    if pool is None:
+        with ocr_worker_pool(workers, langs, cache_dir) as own_pool:
+            yield from process_slides_parallel(items, workers, batch_size, langs, cache_dir, cache_stats,
+                                               title_source, known_titles, pool=own_pool, **options)
+        return
+    step = max(1, int(batch_size))
+    options = dict(options, batch_size=step, langs=tuple(langs))
+    pending = deque()
+
+    def drain_one():
+        chunk, future = pending.popleft()
+        part = {}
+        if future is not None:
+            part, part_stats, part_metrics = future.result()
+            if cache_stats is not None:
+                for k, v in part_stats.items():
+                    cache_stats[k] = cache_stats.get(k, 0) + v
+            METRICS.merge(part_metrics)
+        return chunk, part
+
+    for chunk in iter_chunks(items, step):
+        jobs = [(idx, blob) for idx, blob, _ in chunk if blob is not None]
+        job_options = dict(options, ocr_indices=ocr_wanted(chunk, title_source, known_titles))
+        future = pool.submit(_process_chunk_in_worker, (jobs, job_options)) if jobs else None
+        pending.append((chunk, future))
+        if len(pending) >= 2 * workers:
+            yield drain_one()
+    while pending:
+        yield drain_one()
+
+def resolve_title(ocr_title, fallback_title, idx, title_case="smart"):
+    """OCR title, else the slide's own text, else "Dashboard N"; trimmed and cased."""
+    title_text = ocr_title
+    # Fallback to text extraction from slide if OCR didn't work
+    if not title_text:
+        METRICS.count("title_fallback_text" if fallback_title else "title_fallback_default")
+        title_text = fallback_title or f"Dashboard {idx}"
+    # Limit to a reasonable length to avoid overflows
+    title_text = (title_text or "")[:120]
+    return apply_title_case(title_text, title_case)
+
+def add_styled_slide(prs, layout, title_text, image_bytes, profile=None):
+    """
+    Append one styled slide: title in the layout's title placeholder (or a
+    textbox) and the dashboard picture placed, rounded and shadowed, with the
+    fragments precompiled in profile (a StyleProfile; defaults when None).
+    """
+    profile = profile or StyleProfile()
+    # create new slide using chosen layout
+    slide = prs.slides.add_slide(layout)
+
+    # Put title into slide
+    if slide.shapes.title:
+        slide.shapes.title.text = title_text
+        profile.style_title_run(slide.shapes.title.text_frame.paragraphs[0].runs[0])
+    else:
+        tb = slide.shapes.add_textbox(Inches(0.7), Inches(0.5), prs.slide_width - Inches(1.4), Inches(0.6))
+        p = tb.text_frame.paragraphs[0]
+        p.text = title_text
+        profile.style_title_run(p.runs[0])
+
+    # Add the rounded-corner image to the slide, then clone the profile's geometry and shadow onto it
+    if image_bytes:
+        with METRICS.stage("add_picture", bytes_in=len(image_bytes)):
+            pic = slide.shapes.add_picture(io.BytesIO(image_bytes), 0, 0)
+            fit_image_on_blank(slide, prs, pic, left_in=profile.image_left, top_in=profile.image_top)
+        with METRICS.stage("style_picture"):
+            width_px, height_px = pic.image.size
+            profile.style_picture(pic, width_px, height_px)
+    return slide
+
+class BulkSlideWriter:
+    """
+    Assemble many styled slides without the per-slide shapes API.
+
+    The first slide (and the first slide with a picture) is built normally with
+    add_styled_slide and its XML becomes the prototype. Every following slide
+    is a deep copy with the title text, picture relationship, width and corner
+    radius substituted, added as a SlidePart with precomputed part names, slide
+    ids and SHA1 image de-duplication, so assembly stays linear in slide count
+    instead of rescanning the package for every slide and image.
+    Takes the same StyleProfile as add_styled_slide.
+    """
+
+    def __init__(self, prs, layout, profile=None):
+        self.prs = prs
+        self.layout = layout
+        self.profile = profile or StyleProfile()
+        self._pres_part = prs.part
+        self._package = prs.part.package
+        self._sldIdLst = prs.slides._sldIdLst
+        self._base = None      # prototype slide element without its picture
+        self._title_t = None   # position of the title's a:t among the slide's a:t elements
+        self._pic = None       # prototype p:pic element
+        self._sync_counters()
+
+    def _sync_counters(self):
+        """Refresh part-name / id counters after a slide was added through the API."""
+        self._next_slide_num = len(self._sldIdLst) + 1
+        self._next_sld_id = max([sldId.id for sldId in self._sldIdLst] + [255]) + 1
+        self._image_parts = {}
+        self._next_image_num = 1
+        for part in self._package.iter_parts():
+            if isinstance(part, ImagePart):
+                self._image_parts[part.sha1] = part
+                m = re.match(r"/ppt/media/image(\d+)\.", str(part.partname))
+                if m:
+                    self._next_image_num = max(self._next_image_num, int(m.group(1)) + 1)
+
+    def add(self, title_text, image_bytes):
+        stampable = "\n" not in title_text and "\v" not in title_text
+        if not stampable or self._base is None or (image_bytes and self._pic is None):
+            slide = add_styled_slide(self.prs, self.layout, title_text, image_bytes, self.profile)
+            if stampable:
+                self._capture(slide._element, title_text)
+            self._sync_counters()
+            return
+        with METRICS.stage("stamp_slide", bytes_in=len(image_bytes or b"")):
+            self._stamp(title_text, image_bytes)
+
+    def _capture(self, slide_elm, title_text):
+        texts = list(slide_elm.iter(qn('a:t')))
+        matches = [i for i, t in enumerate(texts) if t.text == title_text]
+        if not matches:
+            return
+        base = copy.deepcopy(slide_elm)
+        tree = base.find(qn('p:cSld')).find(qn('p:spTree'))
+        pics = tree.findall(qn('p:pic'))
+        if pics and self._pic is None:
+            self._pic = copy.deepcopy(pics[0])
+        for pic in pics:
+            tree.remove(pic)
+        self._base = base
+        self._title_t = matches[0]
+
+    def _image_part(self, image_bytes):
+        image = PptxImage.from_blob(image_bytes)
+        part = self._image_parts.get(image.sha1)
+        if part is None:
+            partname = PackURI(f"/ppt/media/image{self._next_image_num}.{image.ext}")
+            self._next_image_num += 1
+            part = ImagePart(partname, image.content_type, self._package, image.blob, image.filename)
+            self._image_parts[image.sha1] = part
+        return part, image
+
+    def _stamp(self, title_text, image_bytes):
+        elm = copy.deepcopy(self._base)
+        list(elm.iter(qn('a:t')))[self._title_t].text = title_text
+
+        partname = PackURI(f"/ppt/slides/slide{self._next_slide_num}.xml")
+        self._next_slide_num += 1
+        slide_part = SlidePart(partname, CT.PML_SLIDE, self._package, elm)
+        slide_part.relate_to(self.layout.part, RT.SLIDE_LAYOUT)
+
+        if image_bytes:
+            image_part, image = self._image_part(image_bytes)
+            rId = slide_part.relate_to(image_part, RT.IMAGE)
+            pic = copy.deepcopy(self._pic)
+            pic.find(qn('p:blipFill')).find(qn('a:blip')).set(qn('r:embed'), rId)
+            # Same arithmetic as add_picture's native size + fit_image_on_blank
+            width_px, height_px = image.size
+            horz_dpi, vert_dpi = image.dpi
+            native_w = int(914400 * width_px / horz_dpi)
+            native_h = int(914400 * height_px / vert_dpi)
+            spPr = pic.find(qn('p:spPr'))
+            ext = spPr.find(qn('a:xfrm')).find(qn('a:ext'))
+            ext.set('cx', str(int(int(ext.get('cy')) * (native_w / native_h))))
+            gd = spPr.find(qn('a:prstGeom') + '/' + qn('a:avLst') + '/' + qn('a:gd'))
+            if gd is not None and self.profile.corner_mode == "vector":
+                gd.set('fmla', f'val {corner_adj(self.profile.border_radius, width_px, height_px)}')
+            elm.find(qn('p:cSld')).find(qn('p:spTree')).append(pic)
+
+        rId = self._pres_part.relate_to(slide_part, RT.SLIDE)
+        self._sldIdLst._add_sldId(id=self._next_sld_id, rId=rId)
+        self._next_sld_id += 1
+
+class PictureBytes:
+    """Exported vs placed picture sizes across a deck, for the bytes-saved-per-slide report."""
+
+    def __init__(self):
+        self.count = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def add(self, source, placed):
+        if source is None or placed is None:
+            return
+        self.count += 1
+        self.bytes_in += len(source)
+        self.bytes_out += len(placed)
+
+    def summary(self) -> str:
+        saved = self.bytes_in - self.bytes_out
+        return (f"{self.bytes_in / 1e6:.1f} MB exported -> {self.bytes_out / 1e6:.1f} MB placed "
+                f"({saved / 1e6:.1f} MB saved, {saved / 1024 / self.count:.0f} KB per slide)")
+
+def save_presentation(prs, target, zip_level=DEFAULT_ZIP_LEVEL, store_media=False):
+    """
+    Save prs to a path or a binary file object, timed as the "save" stage.
+    zip_level and store_media are as for pptx_writer.save_pptx.
+    """
+    with METRICS.stage("save") as st:
+        save_pptx(prs, target, zip_level, store_media)
+        if METRICS.enabled:
+            st.bytes_out = target.tell() if hasattr(target, "tell") else os.path.getsize(target)
+
+class StyleSession:
+    """
+    Everything shared by the decks styled in one CLI process: the parsed
+    template and layout, the OCR reader (or worker pool), and the title cache.
+    style_deck() styles one input; close() releases the shared resources.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        # Parsed once; each deck starts from a copy (theme, masters, and its own layout)
+        self.template_bytes = Path(args.template).read_bytes()
+        self.templates = TemplateCache(find_layout)
+
+        # Title and picture styling, compiled once for every deck
+        self.profile = StyleProfile.from_options(args)
+
+        self.ink_screen = None
+        if args.ink_screen:
+            self.ink_screen = dict(INK_SCREEN, min_contrast=args.ink_contrast, min_ink_ratio=args.ink_min_ratio)
+        # Resample pictures to what their placed size needs at --target-dpi
+        self.max_height_px = target_height_px(args.target_dpi)
+
+        # OCR title cache (opened here to apply eviction limits; workers open their own connection)
+        self.cache = None
+        self.cache_dir = None
+        if args.cache:
+            self.cache_dir = args.cache_dir or default_cache_dir()
+            self.cache = TitleCache(self.cache_dir, max_entries=args.cache_max_entries,
+                                    max_age_days=args.cache_max_age_days)
+
+        self.langs = normalize_langs(args.ocr_langs)
+        # OCR + rounded corners: in-process, or fanned out to a process pool kept for the whole session
+        self.reader = None
+        self.pool = None
+        if args.workers > 1:
+            self.pool = ocr_worker_pool(args.workers, self.langs, cache_dir=self.cache_dir)
+        elif args.title_source != "text":
+            # OCR reader is loaded once, on the first slide that needs it (first run will download model)
+            self.reader = LazyReader(self.langs)
+
+    def style_deck(self, input_path, output_path, workbook_path=None) -> int:
+        """Style one Tableau export into output_path; returns the number of slides written."""
+        args = self.args
+        out, layout = self.templates.checkout(self.template_bytes)  # base on template to inherit theme/master
+        add_slide_number(out)
+
+        # Titles straight from the workbook; only unmatched slides are OCR'd
+        workbook = WorkbookTitles.load(workbook_path) if workbook_path else None
+        known_titles = match_workbook_titles(workbook, input_path, args.workbook_match)
+        if workbook is not None:
+            print(f"Workbook: {len(workbook)} sheets, {len(known_titles)} slides titled by position")
+
+        # Manifest of this run; with --incremental, unchanged slides come from the previous output
+        run = IncrementalRun(output_path, dict(
+            radius_px=args.border_radius, corner_mode=args.corner_mode, max_height_px=self.max_height_px,
+            title_source=args.title_source, title_case=args.title_case, ink_screen=self.ink_screen,
+            ocr_min_conf=OCR_MIN_CONF, ocr_mode=args.ocr_mode, ocr_langs=self.langs, workbook=file_digest(workbook_path) if workbook_path else None,
+            workbook_match=args.workbook_match, image_encoding=args.image_encoding, png_level=args.png_level,
+            png_optimize=args.png_optimize,
+        ), enabled=args.incremental)
+
+        # Source slides are read lazily, one OCR batch at a time
+        total = count_source_slides(input_path)
+        items = run.items(iter_source_slides(input_path))
+
+        options = dict(radius_px=args.border_radius, corner_mode=args.corner_mode, max_height_px=self.max_height_px,
+                       title_source=args.title_source, known_titles=known_titles, ink_screen=self.ink_screen,
+                       ocr_mode=args.ocr_mode, langs=self.langs, image_encoding=args.image_encoding,
+                       png_level=args.png_level, png_optimize=args.png_optimize)
+        cache_stats = {"hits": 0, "misses": 0}
+        cache_before = self.cache.stats() if self.cache else None
+        if self.pool is not None:
+            print(f"Processing {total} slides with {args.workers} worker processes (each loads its own OCR model when needed)...")
+            chunks = process_slides_parallel(items, args.workers, batch_size=args.ocr_batch_size, cache_dir=self.cache_dir,
+                                             cache_stats=cache_stats, pool=self.pool, **options)
+        else:
+            chunks = process_slides_serial(items, self.reader, batch_size=args.ocr_batch_size, cache=self.cache,
+                                           **options)
+
+        # Assemble in original slide order as batches complete
+        writer = BulkSlideWriter(out, layout, self.profile) if args.assembly == "bulk" else None
+        done = 0
+        pictures = PictureBytes()
+        for chunk, processed in chunks:
+            for idx, blob, fallback_title in chunk:
+                reused = run.reused(idx)
+                if reused is not None:
+                    title_text, image_bytes = reused
+                    if idx in known_titles:
+                        title_text = resolve_title(known_titles[idx], fallback_title, idx, args.title_case)
+                else:
+                    ocr_title, image_bytes = processed.get(idx, (None, None))
+                    ocr_title = workbook_title(workbook, known_titles, idx, ocr_title)
+                    title_text = resolve_title(ocr_title, fallback_title, idx, args.title_case)
+                run.record(idx, title_text, image_bytes)
+                pictures.add(blob, image_bytes)
+                if writer:
+                    writer.add(title_text, image_bytes)
+                else:
+                    add_styled_slide(out, layout, title_text, image_bytes, self.profile)
+            done += len(chunk)
+            print(f"Styled {done}/{total} slides")
+
+        if self.cache:
+            if self.pool is None:
+                after = self.cache.stats()
+                cache_stats = {k: after[k] - cache_before[k] for k in after}
+            print(f"Title cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({self.cache_dir})")
+
+        if pictures.count:
+            print(f"Pictures: {pictures.summary()}")
+        if args.incremental:
+            print(f"Incremental: reused {run.reused_count} of {total} slides from the previous output")
+        run.close_previous()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        save_presentation(out, str(output_path), args.zip_level, args.store_media)
+        run.write(out)
+        print(f"✅ Wrote {output_path}")
+        return done
+
+    def close(self):
+        stats = self.templates.stats()
+        if stats["hits"]:
+            print(f"Template cache: {stats['hits']} hits, {stats['misses']} misses")
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--input", "-i", required=True, help="Tableau-exported PPTX")
+    ap.add_argument("--input", "-i", action="append", default=[],
+                    help="Tableau-exported PPTX. Repeat it, or pass a directory or glob (quote it), to style several decks "
+                         "in one process")
     ap.add_argument("--template", "-t", required=True, help="Brand template PPTX (with masters, theme, slide numbers, etc.)")
-    ap.add_argument("--output", "-o", default="styled_output.pptx")
-    ap.add_argument("--title-case", choices=["smart","camel","upper","lower"], default="smart")
+    ap.add_argument("--output", "-o", default=None, help="Output PPTX for a single input (default styled_output.pptx)")
+    # Batch / watch mode
+    ap.add_argument("--jobs", default=None,
+                    help="Job list file: one deck per line, tab-separated `input [output [workbook]]`")
+    ap.add_argument("--output-dir", default=None,
+                    help="Where batch and watch outputs go, as <input name>_styled.pptx (default: next to each input)")
+    ap.add_argument("--watch", default=None, metavar="DIR",
+                    help="Keep running and style each new .pptx export that appears in DIR")
+    ap.add_argument("--watch-interval", type=float, default=5.0, help="Seconds between folder scans in --watch mode (default 5)")
+    ap.add_argument("--watch-settle", type=float, default=2.0,
+                    help="Seconds an export must stay unchanged before --watch picks it up (default 2)")
+    ap.add_argument("--style-profile", default=None, metavar="FILE",
+                    help="JSON/YAML style profile with title, corner, placement and shadow settings (keys as the option "
+                         "names, e.g. title_font_size); options given on the command line override it")
+    ap.add_argument("--title-case", choices=TITLE_CASES, default="smart")
     ap.add_argument("--title-font-size", type=int, default=28)
     ap.add_argument("--border-radius", type=int, default=10, help="Border radius in pixels for rounded corners on images")
+    ap.add_argument("--corner-mode", choices=CORNER_MODES, default="vector",
+                    help="vector: PowerPoint roundRect geometry on the original image (fast, default); raster: bake transparent corners into a PNG")
     # Image placement (inches)
     ap.add_argument("--image-left", type=float, default=2.5, help="Left position in inches for the image")
     ap.add_argument("--image-top", type=float, default=1.7, help="Top position in inches for the image")
+    ap.add_argument("--target-dpi", type=int, default=0,
+                    help="Downsample images to this DPI at their placed size (e.g. 200; 0 keeps the exported resolution). "
+                         "--border-radius applies to the resampled pixels")
     # Shadow controls (on by default)
     ap.add_argument("--shadow", dest="shadow", action="store_true", default=True, help="Apply drop shadow to images (default on)")
     ap.add_argument("--no-shadow", dest="shadow", action="store_false", help="Disable drop shadow on images")
@@ -261,89 +1072,101 @@ def main():
     ap.add_argument("--shadow-blur", type=int, default=15, help="Shadow blur in points (default 15)")
     ap.add_argument("--shadow-angle", type=int, default=34, help="Shadow angle in degrees (default 34)")
     ap.add_argument("--shadow-distance", type=int, default=3, help="Shadow distance in points (default 3)")
+    # Parallelism
+    ap.add_argument("--workers", type=int, default=1, help="Worker processes for OCR + image work (each loads its own OCR model; default 1)")
+    ap.add_argument("--title-source", choices=list(TITLE_SOURCES), default="ocr",
+                    help="ocr: OCR each dashboard image, falling back to slide text (default); text: slide text only, "
+                         "never loads OCR; auto: slide text where present, OCR for the rest")
+    ap.add_argument("--workbook", "-w", default=None,
+                    help="Tableau workbook (.twb/.twbx) the deck was exported from; its sheet titles replace OCR")
+    ap.add_argument("--workbook-match", choices=["auto","order","fuzzy"], default="auto",
+                    help="auto/order: pair picture slides with sheets by position when the counts agree, OCR the rest; "
+                         "fuzzy: OCR every slide and snap the text to the closest workbook title (default auto)")
+    ap.add_argument("--ocr-langs", default="en",
+                    help="Comma-separated easyocr language codes for titles, e.g. en,de or fr (default en); "
+                         "each language set loads its own model")
+    ap.add_argument("--ocr-mode", choices=list(OCR_MODES), default="full",
+                    help="full: easyocr text detection + recognition on the title strip (default); fast: recognize the "
+                         "title line found by a projection profile, using full OCR only when confidence is too low")
+    ap.add_argument("--ocr-batch-size", type=int, default=8, help="Title crops per batched OCR call (default 8)")
+    ap.add_argument("--ink-contrast", type=int, default=INK_SCREEN["min_contrast"],
+                    help="Gray-level difference from the title strip background that counts as ink (default 40)")
+    ap.add_argument("--ink-min-ratio", type=float, default=INK_SCREEN["min_ink_ratio"],
+                    help="Title strips with less than this fraction of ink pixels skip OCR as blank (default 0.002)")
+    ap.add_argument("--no-ink-screen", dest="ink_screen", action="store_false", default=True,
+                    help="OCR every title strip untrimmed, even blank ones")
+    ap.add_argument("--assembly", choices=["bulk","api"], default="bulk",
+                    help="bulk: stamp slides from a prototype slide (fast for large decks, default); api: build every slide through python-pptx shapes")
+    ap.add_argument("--image-encoding", choices=list(IMAGE_ENCODINGS), default="truecolor",
+                    help="truecolor: full-colour PNG as before (default); palette: adaptive 256-colour PNG keeping corner "
+                         "transparency; smallest: whichever is smaller, palette only when it stays faithful to the original")
+    ap.add_argument("--png-level", type=int, choices=range(10), default=DEFAULT_PNG_LEVEL, metavar="0-9",
+                    help="zlib level for encoded PNG pictures (default 6)")
+    ap.add_argument("--png-optimize", action="store_true",
+                    help="Let the PNG encoder search for the smallest output (slower encode)")
+    ap.add_argument("--zip-level", type=int, choices=range(10), default=DEFAULT_ZIP_LEVEL, metavar="0-9",
+                    help="Deflate level for the output zip's XML and any pictures still deflated (default 6; 1 saves faster, 0 stores everything)")
+    ap.add_argument("--store-media", dest="store_media", action="store_true", default=True,
+                    help="Store already-compressed pictures uncompressed in the output zip instead of deflating them again (default on)")
+    ap.add_argument("--no-store-media", dest="store_media", action="store_false", help="Deflate every part, as python-pptx does")
+    # OCR title cache
+    ap.add_argument("--cache-dir", default=None, help="Directory for the OCR title cache (default $PPTX_STYLIZER_CACHE_DIR or ~/.cache/tableau-pptx-stylizer)")
+    ap.add_argument("--no-cache", dest="cache", action="store_false", default=True, help="Do not read or write the OCR title cache")
+    ap.add_argument("--cache-max-entries", type=int, default=50000, help="Maximum cached titles before least-recently-used are evicted (default 50000)")
+    ap.add_argument("--cache-max-age-days", type=float, default=90, help="Evict cached titles unused for this many days (default 90)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Reuse titles and styled images from the previous --output for slides whose source image "
+                         "and title/image options are unchanged (tracked in <output>.manifest.json, written every run)")
+    ap.add_argument("--profile", action="store_true",
+                    help="Print a JSON report of per-stage wall time, calls, bytes and OCR fallbacks when done")
     args = ap.parse_args()
+    if args.style_profile:
+        # Profile values become the defaults, so explicit options still win
+        try:
+            ap.set_defaults(**load_profile_file(args.style_profile))
+        except (OSError, ValueError) as e:
+            ap.error(f"--style-profile: {e}")
+        args = ap.parse_args()
+    METRICS.enabled = args.profile
 
-    src = Presentation(args.input)
-    tpl = Presentation(args.template)
-    out = Presentation(args.template)  # base on template to inherit theme/master
-    layout = find_layout(tpl)
-    add_slide_number(out)
-
-    # Initialize OCR reader once (first run will download model)
-    print("Initializing OCR reader (first run may download language models)...")
-    reader = easyocr.Reader(['en'], gpu=False)
-    print("OCR reader ready.")
+    batch_mode = bool(args.jobs or args.watch or len(args.input) > 1
+                      or any(Path(p).is_dir() or glob.has_magic(p) for p in args.input))
+    if not (args.input or args.jobs or args.watch):
+        ap.error("one of --input, --jobs or --watch is required")
+    if batch_mode and args.output:
+        ap.error("--output names a single deck; use --output-dir with several inputs, --jobs or --watch")
+    if batch_mode and args.workbook:
+        ap.error("--workbook applies to a single deck; give per-deck workbooks in a --jobs file instead")
 
-    # Parse shadow color
-    shadow_color = None
+    session = StyleSession(args)
+    failed = 0
     try:
-        shadow_color = tuple(int(args.shadow_color[i:i+2], 16) for i in (0,2,4))
-    except Exception:
-        shadow_color = (0, 0, 0)
-
-    for idx, s in enumerate(src.slides, start=1):
-        # create new slide using chosen layout
-        slide = out.slides.add_slide(layout)
-
-        # 1) Extract image first (needed for OCR)
-        image_path = None
-        for shp in s.shapes:
-            if getattr(shp, "image", None) is not None:
-                ext = shp.image.ext or "png"
-                tmp = f"_tmp_slide_{idx}.{ext}"
-                with open(tmp, "wb") as f:
-                    f.write(shp.image.blob)
-                image_path = tmp
-                break
-
-        # 2) Extract title using OCR from image, or fallback to slide text
-        title_text = None
-        if image_path and os.path.exists(image_path):
-            print(f"Extracting title from image {idx}...")
-            title_text = extract_title_from_image(image_path, reader)
-        
-        # Fallback to text extraction from slide if OCR didn't work
-        if not title_text:
-            title_text = guess_title_from_slide(s) or f"Dashboard {idx}"
-        
-        # Limit to a reasonable length to avoid overflows
-        title_text = (title_text or "")[:120]
-        title_text = apply_title_case(title_text, args.title_case)
-        
-        # Put title into slide
-        if slide.shapes.title:
-            slide.shapes.title.text = title_text
-            slide.shapes.title.text_frame.paragraphs[0].runs[0].font.size = Pt(args.title_font_size)
-        else:
-            tb = slide.shapes.add_textbox(Inches(0.7), Inches(0.5), out.slide_width - Inches(1.4), Inches(0.6))
-            p = tb.text_frame.paragraphs[0]
-            p.text = title_text
-            p.runs[0].font.size = Pt(args.title_font_size)
-
-        # 3) Add image to slide with rounded corners
-        if image_path and os.path.exists(image_path):
-            # Add rounded corners to the image
-            add_rounded_corners(image_path, radius_px=args.border_radius)
-            
-            pic = slide.shapes.add_picture(image_path, 0, 0)
-            fit_image_on_blank(slide, out, pic, left_in=args.image_left, top_in=args.image_top)
-            # Apply drop shadow if enabled
-            if args.shadow:
-                apply_box_shadow(
-                    pic,
-                    transparency=args.shadow_transparency,
-                    blur_pt=args.shadow_blur,
-                    angle_deg=args.shadow_angle,
-                    distance_pt=args.shadow_distance,
-                    color=shadow_color,
-                )
+        if not batch_mode:
             try:
-                os.remove(image_path)
-            except Exception:
-                pass
-
-    out.save(args.output)
-    print(f"✅ Wrote {args.output}")
+                session.style_deck(args.input[0], args.output or "styled_output.pptx", args.workbook)
+            except ReaderUnavailable as e:
+                print(f"Error: {e}")
+                failed = 1
+        else:
+            def style_job(job):
+                return session.style_deck(job.input, job.output, job.workbook)
+            jobs = expand_inputs(args.input, args.output_dir)
+            if args.jobs:
+                jobs += read_job_list(args.jobs, args.output_dir)
+            if jobs:
+                failed = sum(1 for r in run_batch(jobs, style_job) if not r["ok"])
+            if args.watch:
+                try:
+                    watch_folder(args.watch, style_job, args.output_dir, interval=args.watch_interval,
+                                 settle_seconds=args.watch_settle)
+                except KeyboardInterrupt:
+                    print("Stopped watching.")
+    finally:
+        session.close()
+    if args.profile:
+        print(json.dumps(METRICS.report(), indent=2))
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
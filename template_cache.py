@@ -0,0 +1,120 @@
+"""
+In-memory cache of parsed brand templates, keyed by content hash.
+
+Users style against the same brand template all day, so its zip and XML are
+parsed once and kept together with the resolved slide layout. Every job then
+gets its own deep copy of the parsed package (a few ms, versus re-reading the
+zip and re-parsing every part), with the layout looked up in that copy so
+slides never reference another package's layout part. Entries are evicted
+least-recently-used once their combined part size exceeds max_bytes.
+
+Usage:
+  cache = TemplateCache(find_layout, max_bytes=64 << 20)
+  out, layout = cache.checkout("brand_template.pptx")   # or the template's bytes
+  ...                                                   # add slides to out, save it
+  cache.preload("brand_template.pptx")                  # parse ahead of the first request
+  cache.stats()    # {"hits", "misses", "evictions", "entries", "bytes"}
+"""
+
+import copy
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from pptx import Presentation
+
+from metrics import METRICS
+
+DEFAULT_MAX_BYTES = 64 << 20
+
+
+class _Entry:
+    __slots__ = ("prs", "layout_index", "size")
+
+    def __init__(self, prs, layout_index, size):
+        self.prs = prs
+        self.layout_index = layout_index
+        self.size = size
+
+
+def _layout_index(prs, find_layout):
+    layout = find_layout(prs)
+    for i, candidate in enumerate(prs.slide_layouts):
+        if candidate.part is layout.part:
+            return i
+    return 0
+
+
+class TemplateCache:
+    """
+    Thread-safe LRU of parsed templates. find_layout(prs) picks the layout
+    slides are added with.
+    An entry's size is the total size of its parts as stored in the template.
+    """
+
+    def __init__(self, find_layout, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self.find_layout = find_layout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def checkout(self, template):
+        """(presentation, layout) for a private copy of template (a path or its bytes)."""
+        data = template if isinstance(template, bytes) else Path(template).read_bytes()
+        key = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                METRICS.count("template_cache_hit")
+            else:
+                self.misses += 1
+                METRICS.count("template_cache_miss")
+                entry = self._load(data)
+                self._insert(key, entry)
+            with METRICS.stage("template_copy"):
+                prs = copy.deepcopy(entry.prs)
+        return prs, prs.slide_layouts[entry.layout_index]
+
+    def preload(self, template):
+        """Parse template into the cache without checking out a copy (e.g. before forking workers)."""
+        data = template if isinstance(template, bytes) else Path(template).read_bytes()
+        key = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            if key not in self._entries:
+                self._insert(key, self._load(data))
+
+    def _load(self, data):
+        with METRICS.stage("template_parse", bytes_in=len(data)):
+            prs = Presentation(io.BytesIO(data))
+            # Resolve the layout (and everything it touches) before the first copy
+            layout_index = _layout_index(prs, self.find_layout)
+            size = sum(len(part.blob) for part in prs.part.package.iter_parts())
+        return _Entry(prs, layout_index, size)
+
+    def _insert(self, key, entry):
+        self._entries[key] = entry
+        self._bytes += entry.size
+        # Always keep the newest entry, even when it alone is over budget
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            self.evictions += 1
+            METRICS.count("template_cache_eviction")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self._bytes}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,130 @@
+"""
+Persistent, content-addressed cache of OCR'd slide titles.
+
+Weekly re-exports of the same Tableau dashboards produce pixel-identical title
+strips, so the extracted title is stored in SQLite keyed by a hash of the
+cropped title region plus the OCR settings that influence the result
+(languages and confidence threshold). Slides whose strip had no readable title
+are cached too, so blank strips are not re-OCR'd either.
+
+Usage:
+  cache = TitleCache(default_cache_dir())
+  key = cache.key(crop, langs=("en",), min_conf=0.3)
+  found, title = cache.get(key)
+  if not found:
+      cache.put(key, ocr(crop))
+  cache.close()
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    key TEXT PRIMARY KEY,
+    title TEXT,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS titles_last_used ON titles (last_used);
+"""
+
+
+def default_cache_dir() -> Path:
+    """PPTX_STYLIZER_CACHE_DIR, else ~/.cache/tableau-pptx-stylizer."""
+    env = os.environ.get("PPTX_STYLIZER_CACHE_DIR")
+    if env:
+        return Path(env)
+    return Path.home() / ".cache" / "tableau-pptx-stylizer"
+
+
+class TitleCache:
+    """
+    SQLite title cache with size- and age-based eviction.
+
+    - max_entries: keep at most this many rows (least recently used go first).
+    - max_age_days: drop rows not used for this many days.
+    Limits are applied on open, on close and every EVICT_EVERY put()s, so a
+    long-running server keeps to them too. Safe to share between threads; separate processes open their own instance.
+    """
+
+    EVICT_EVERY = 1000
+
+    def __init__(self, directory, max_entries: int = 50000, max_age_days: float = 90):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / "titles.sqlite3"
+        self.max_entries = int(max_entries)
+        self.max_age_days = float(max_age_days)
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self.evict()
+
+    @staticmethod
+    def key(crop, langs: Sequence[str] = ("en",), min_conf: float = 0.3, ocr_mode: str = "full") -> str:
+        """Hash of the crop's pixels (mode + size + raw bytes) and the OCR settings."""
+        h = hashlib.sha256()
+        h.update(f"{crop.mode}:{crop.size[0]}x{crop.size[1]}".encode())
+        h.update(crop.tobytes())
+        h.update(f"|{','.join(langs)}|{min_conf:.4f}".encode())
+        if ocr_mode != "full":
+            # Full-OCR keys predate the mode and stay unchanged
+            h.update(f"|{ocr_mode}".encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Optional[str]]:
+        """Return (found, title); title may be None for a cached blank strip."""
+        with self._lock:
+            row = self._conn.execute("SELECT title FROM titles WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._conn.execute("UPDATE titles SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return True, row[0]
+
+    def put(self, key: str, title: Optional[str]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO titles (key, title, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, title, now, now),
+            )
+            self._conn.commit()
+            self._puts += 1
+            due = self._puts % self.EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Apply age and size limits; returns the number of rows removed."""
+        with self._lock:
+            cutoff = time.time() - self.max_age_days * 86400
+            removed = self._conn.execute("DELETE FROM titles WHERE last_used < ?", (cutoff,)).rowcount
+            count = self._conn.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+            if count > self.max_entries:
+                removed += self._conn.execute(
+                    "DELETE FROM titles WHERE key IN (SELECT key FROM titles ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                ).rowcount
+            self._conn.commit()
+            return removed
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        try:
+            self.evict()
+        finally:
+            self._conn.close()
@@ -0,0 +1,114 @@
+"""
+Slide titles from the Tableau workbook a deck was exported from.
+
+The .twb XML already holds every sheet's and dashboard's name and title text,
+so when the workbook is at hand there is no need to OCR titles back out of the
+exported pixels. Sheets are read in tab order (the order Tableau exports them)
+and matched to the deck's picture slides either by position, when the counts
+agree, or by fuzzy-matching OCR text against the known titles.
+
+Usage:
+  titles = WorkbookTitles.load("Super Store.twb")     # or a packaged .twbx
+  known = titles.match_order(picture_slide_indices("export.pptx"))   # {slide idx: title}
+  title = titles.snap(ocr_text)                        # closest workbook title, or ocr_text
+"""
+
+import difflib
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from lxml import etree
+
+# Field placeholders such as <Sheet Name> or <[Parameters].[Region]> inside title runs
+_PLACEHOLDER = re.compile(r"<[^<>]*>")
+
+
+def _read_twb(path) -> bytes:
+    """Workbook XML from a .twb, or the top-level .twb inside a packaged .twbx."""
+    path = Path(path)
+    if zipfile.is_zipfile(str(path)):
+        with zipfile.ZipFile(str(path)) as zf:
+            names = sorted((n for n in zf.namelist() if n.lower().endswith(".twb")), key=lambda n: n.count("/"))
+            if not names:
+                raise ValueError(f"No .twb found inside {path.name}")
+            return zf.read(names[0])
+    return path.read_bytes()
+
+
+def _title_text(sheet, name: str) -> Optional[str]:
+    """First line of a sheet's custom title with <Sheet Name> substituted, or None without one."""
+    runs = sheet.findall("layout-options/title/formatted-text/run")
+    if not runs:
+        return None
+    text = "".join(run.text or "" for run in runs)
+    text = text.replace("<Sheet Name>", name).replace("<Page Name>", "")
+    text = _PLACEHOLDER.sub("", text)
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if line:
+            return line[:120]
+    return None
+
+
+def load_workbook_sheets(path) -> List[Tuple[str, str]]:
+    """
+    (sheet name, displayed title) for every visible worksheet and dashboard,
+    in tab order. The title is the sheet's custom title when it has one,
+    otherwise its name (Tableau's default title).
+    """
+    root = etree.fromstring(_read_twb(path), etree.XMLParser(huge_tree=True))
+    sheets = {}
+    for sheet in root.iterfind("worksheets/worksheet"):
+        sheets[sheet.get("name")] = sheet
+    for sheet in root.iterfind("dashboards/dashboard"):
+        sheets[sheet.get("name")] = sheet
+
+    windows = root.findall("windows/window")
+    if windows:
+        order = [w.get("name") for w in windows
+                 if w.get("class") in ("worksheet", "dashboard") and w.get("hidden") != "true"]
+    else:
+        order = list(sheets)
+
+    result = []
+    for name in order:
+        if not name:
+            continue
+        sheet = sheets.get(name)
+        title = _title_text(sheet, name) if sheet is not None else None
+        result.append((name, title or name))
+    return result
+
+
+class WorkbookTitles:
+    """Titles of a workbook's exported sheets, in export order."""
+
+    def __init__(self, titles: Sequence[str]):
+        self.titles = list(titles)
+
+    @classmethod
+    def load(cls, path) -> "WorkbookTitles":
+        return cls([title for _, title in load_workbook_sheets(path)])
+
+    def __len__(self):
+        return len(self.titles)
+
+    def match_order(self, picture_indices: Sequence[int]) -> Dict[int, str]:
+        """
+        {slide idx: title} pairing picture slides with sheets by position.
+        Empty when the counts differ (e.g. only some sheets were exported),
+        since positions would then be ambiguous.
+        """
+        if not self.titles or len(picture_indices) != len(self.titles):
+            return {}
+        return dict(zip(picture_indices, self.titles))
+
+    def snap(self, text: Optional[str], cutoff: float = 0.6) -> Optional[str]:
+        """The workbook title closest to OCR'd text (correcting OCR errors), or text when none is close."""
+        if not text or not self.titles:
+            return text
+        lowered = {t.lower(): t for t in self.titles}
+        match = difflib.get_close_matches(text.lower(), list(lowered), n=1, cutoff=cutoff)
+        return lowered[match[0]] if match else text